@@ -0,0 +1,336 @@
+"""
+Benchmark harness for log-table.py.
+Generates synthetic tables and times the structure analysis, HTML rendering and
+text rendering of the library without going through Robot Framework's logger.
+
+Usage:
+    python bench-log-table.py                                  # run all scenarios
+    python bench-log-table.py --scenario nested --repeat 5
+    python bench-log-table.py --rows 50000 --width 20 --depth 1
+    python bench-log-table.py --save-baseline baseline.json
+    python bench-log-table.py --baseline baseline.json --tolerance 0.25
+    python bench-log-table.py --import-time --max-import-ms 5
+    python bench-log-table.py --cache
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import string
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+SCENARIOS = {
+    'flat': {'rows': 20000, 'width': 12, 'depth': 1, 'fanout': 1, 'value_length': 8},
+    'wide': {'rows': 2000, 'width': 150, 'depth': 1, 'fanout': 1, 'value_length': 8},
+    'nested': {'rows': 2000, 'width': 6, 'depth': 2, 'fanout': 5, 'value_length': 10},
+    'deep': {'rows': 200, 'width': 4, 'depth': 4, 'fanout': 4, 'value_length': 6},
+    'long_values': {'rows': 2000, 'width': 6, 'depth': 2, 'fanout': 3, 'value_length': 200},
+    'shared': {'rows': 2000, 'width': 6, 'depth': 3, 'fanout': 5, 'value_length': 10, 'shared': 4},
+}
+
+PHASES = ('schema', 'html', 'text')
+
+# Small tables logged over and over with the same shape, as in polling loops
+CACHE_SCENARIOS = {
+    'small': {'rows': 10, 'width': 6, 'depth': 1, 'fanout': 1, 'value_length': 8},
+    'small_wide': {'rows': 3, 'width': 40, 'depth': 1, 'fanout': 1, 'value_length': 8},
+    'small_nested': {'rows': 5, 'width': 4, 'depth': 2, 'fanout': 3, 'value_length': 8},
+    'small_deep': {'rows': 2, 'width': 4, 'depth': 3, 'fanout': 2, 'value_length': 6},
+}
+
+# Optional backends that must only be imported by the code paths using them
+LAZY_MODULES = ('html', 'multiprocessing', 'numpy', 'pandas', 'pyarrow', 'orjson', 'ijson', 'simdjson', 'wcwidth')
+
+IMPORT_SCRIPT = """
+import json, sys, time
+import robot.api.deco, robot.api, robot.libraries.BuiltIn
+import importlib.util
+
+before = set(sys.modules)
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('log_table_lib', sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+module.log_table()
+seconds = time.perf_counter() - start
+print(json.dumps({'seconds': seconds, 'modules': sorted(set(sys.modules) - before)}))
+"""
+
+
+def load_library():
+    """Import log-table.py from the directory of this script."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'log-table.py')
+    spec = importlib.util.spec_from_file_location('log_table_lib', path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so that worker processes can resolve the module by name
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def generate_rows(rows, width, depth, fanout, value_length, shared=0, seed=0):
+    """Generate a list of dictionaries with the given shape.
+
+    Every record has ``width`` simple fields. Below depth 1 each record also has a
+    ``nested`` field holding ``fanout`` records of the next level. With ``shared``,
+    the top-level records pick their nested list from that many list objects, like
+    thousands of nodes sharing the same port list.
+    """
+    rnd = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits
+
+    def value():
+        return ''.join(rnd.choices(alphabet, k=rnd.randint(1, value_length)))
+
+    def record(level):
+        data = {f'field_{level}_{i}': value() for i in range(width)}
+        if level < depth:
+            if level == 1 and shared:
+                data['nested'] = rnd.choice(pool)
+            else:
+                data['nested'] = [record(level + 1) for _ in range(fanout)]
+        return data
+
+    pool = [[record(2) for _ in range(fanout)] for _ in range(shared)] if depth > 1 else []
+    return [record(1) for _ in range(rows)]
+
+
+def run_phases(module, table_list):
+    """Run the phases of Log Table once and return their durations and output sizes."""
+    library = module.log_table(cache_size=0)
+    timings = {}
+
+    start = time.perf_counter()
+    schema = module.TableSchema(table_list)
+    timings['schema'] = time.perf_counter() - start
+
+    header_structure, max_depth = schema.fields, schema.max_depth
+    if max_depth == 1:
+        names = [field.name for field in header_structure]
+
+        start = time.perf_counter()
+        columns = library._extract_flat_columns(table_list, names)
+        html = library._generate_flat_html_table(header_structure, columns)
+        timings['html'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        text = library._generate_flat_text_table(names, columns)
+        timings['text'] = time.perf_counter() - start
+    else:
+        start = time.perf_counter()
+        layout = library._compile_layout(table_list, header_structure)
+        html = library._generate_html_table(layout, header_structure, max_depth)
+        timings['html'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        text = library._generate_text_table(header_structure, max_depth, layout)
+        timings['text'] = time.perf_counter() - start
+
+    sizes = {'html': len(html.encode('utf-8')), 'text': len(text.encode('utf-8'))}
+    return timings, sizes
+
+
+def measure_peak_memory(module, table_list):
+    """Return the peak memory allocated while running all phases once."""
+    tracemalloc.start()
+    try:
+        run_phases(module, table_list)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def benchmark(module, name, shape, repeat):
+    """Benchmark one scenario and return its result dictionary."""
+    table_list = generate_rows(**shape)
+    input_bytes = len(json.dumps(table_list).encode('utf-8'))
+
+    best = {phase: float('inf') for phase in PHASES}
+    for _ in range(repeat):
+        timings, sizes = run_phases(module, table_list)
+        for phase in PHASES:
+            best[phase] = min(best[phase], timings[phase])
+
+    phase_bytes = {'schema': input_bytes, 'html': sizes['html'], 'text': sizes['text']}
+    return {
+        'scenario': name,
+        'shape': shape,
+        'input_bytes': input_bytes,
+        'output_bytes': sizes,
+        'seconds': best,
+        'rows_per_second': {phase: shape['rows'] / best[phase] if best[phase] else 0.0 for phase in PHASES},
+        'mb_per_second': {phase: phase_bytes[phase] / 1e6 / best[phase] if best[phase] else 0.0 for phase in PHASES},
+        'peak_memory_bytes': measure_peak_memory(module, table_list),
+    }
+
+
+def measure_cache(module, repeat, calls=200):
+    """Time repeated Log Table calls on tables of one shape without and with the header cache.
+
+    Every call gets a new table of the same shape, like a test logging one table per
+    polling iteration. Returns the best time per call in seconds for both cache sizes.
+    """
+    results = []
+    for name, shape in CACHE_SCENARIOS.items():
+        tables = [generate_rows(**shape, seed=seed) for seed in range(calls)]
+        libraries = {cache_size: module.log_table(cache_size=cache_size) for cache_size in (0, 64)}
+        best = dict.fromkeys(libraries, float('inf'))
+        for library in libraries.values():
+            # Only the rendering is timed, not Robot Framework's logger
+            library._emit = lambda *args, **kwargs: None
+        # Alternating the runs spreads the noise of a busy machine over both
+        for _ in range(repeat):
+            for cache_size, library in libraries.items():
+                start = time.perf_counter()
+                for table in tables:
+                    library.log_table(table)
+                best[cache_size] = min(best[cache_size], (time.perf_counter() - start) / calls)
+        results.append({'scenario': name, 'shape': shape, 'seconds': best})
+    return results
+
+
+def format_cache_results(results):
+    """Format the cache results as a text report."""
+    lines = [f'{"scenario":<12} {"no cache us":>12} {"cache us":>10} {"speedup":>8}']
+    for result in results:
+        off, on = result['seconds'][0], result['seconds'][64]
+        lines.append(f'{result["scenario"]:<12} {off * 1e6:>12.1f} {on * 1e6:>10.1f} {off / on:>7.2f}x')
+    return '\n'.join(lines)
+
+
+def measure_import_time(repeat):
+    """Time importing the library and creating its instance in fresh interpreters.
+
+    Robot Framework is imported before the timer starts, so only the cost of the
+    library itself is measured. Returns the best time and the modules it imported.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'log-table.py')
+    best = float('inf')
+    modules = set()
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT, path], capture_output=True, text=True,
+                                check=True).stdout
+        run = json.loads(output)
+        best = min(best, run['seconds'])
+        modules.update(run['modules'])
+    return {'seconds': best, 'modules': sorted(modules)}
+
+
+def check_import_time(result, max_import_ms):
+    """Return a description of every import time guard the result violates."""
+    problems = [f'{name} imported at library import time' for name in result['modules']
+                if name.split('.')[0] in LAZY_MODULES]
+    if max_import_ms is not None and result['seconds'] * 1000 > max_import_ms:
+        problems.append(f'import took {result["seconds"] * 1000:.1f} ms > {max_import_ms} ms allowed')
+    return problems
+
+
+def format_results(results):
+    """Format the results as a text report."""
+    lines = [f'{"scenario":<12} {"phase":<7} {"seconds":>10} {"rows/s":>12} {"MB/s":>9} {"peak MB":>9}']
+    for result in results:
+        for phase in PHASES:
+            lines.append(f'{result["scenario"]:<12} {phase:<7} {result["seconds"][phase]:>10.4f} '
+                         f'{result["rows_per_second"][phase]:>12.0f} {result["mb_per_second"][phase]:>9.2f} '
+                         f'{result["peak_memory_bytes"] / 1e6:>9.1f}')
+    return '\n'.join(lines)
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Return a description of every phase that got slower than the baseline allows."""
+    regressions = []
+    baseline_by_name = {result['scenario']: result for result in baseline}
+
+    for result in results:
+        base = baseline_by_name.get(result['scenario'])
+        if base is None or base['shape'] != result['shape']:
+            continue
+        for phase in PHASES:
+            limit = base['seconds'][phase] * (1 + tolerance)
+            if result['seconds'][phase] > limit:
+                regressions.append(f'{result["scenario"]}/{phase}: {result["seconds"][phase]:.4f}s '
+                                   f'> {base["seconds"][phase]:.4f}s baseline (+{tolerance:.0%} allowed)')
+    return regressions
+
+
+def parse_args(argv):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description='Benchmark log-table.py with synthetic tables.')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='Scenario to run, can be given several times. Default: all')
+    parser.add_argument('--rows', type=int, help='Number of top-level rows (custom scenario)')
+    parser.add_argument('--width', type=int, default=10, help='Simple fields per record (custom scenario)')
+    parser.add_argument('--depth', type=int, default=1, help='Nesting depth (custom scenario)')
+    parser.add_argument('--fanout', type=int, default=3, help='Nested records per list (custom scenario)')
+    parser.add_argument('--value-length', type=int, default=8, help='Maximum value length (custom scenario)')
+    parser.add_argument('--shared', type=int, default=0,
+                        help='Distinct nested lists shared by the top-level records (custom scenario)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per scenario, the best one is reported')
+    parser.add_argument('--save-baseline', metavar='PATH', help='Write the results to a baseline file')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare the results with a baseline file')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed slowdown against the baseline as a fraction. Default: 0.2')
+    parser.add_argument('--import-time', action='store_true',
+                        help='Measure the library import time in fresh interpreters instead of rendering')
+    parser.add_argument('--max-import-ms', type=float,
+                        help='Fail when the library import takes longer than this (with --import-time)')
+    parser.add_argument('--cache', action='store_true',
+                        help='Time repeated calls on small tables without and with the header cache')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.import_time:
+        result = measure_import_time(args.repeat)
+        print(f'import {result["seconds"] * 1000:.2f} ms, {len(result["modules"])} new modules: '
+              f'{" ".join(result["modules"]) or "-"}')
+        problems = check_import_time(result, args.max_import_ms)
+        if problems:
+            print('Import time guard failed:')
+            print('\n'.join(problems))
+            return 1
+        return 0
+
+    if args.cache:
+        print(format_cache_results(measure_cache(load_library(), args.repeat)))
+        return 0
+
+    if args.rows:
+        scenarios = {'custom': {'rows': args.rows, 'width': args.width, 'depth': args.depth,
+                                'fanout': args.fanout, 'value_length': args.value_length, 'shared': args.shared}}
+    else:
+        names = args.scenario or list(SCENARIOS)
+        scenarios = {name: SCENARIOS[name] for name in names}
+
+    module = load_library()
+    results = [benchmark(module, name, shape, args.repeat) for name, shape in scenarios.items()]
+    print(format_results(results))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f'Baseline saved to {args.save_baseline}')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+        if regressions:
+            print('Regressions against baseline:')
+            print('\n'.join(regressions))
+            return 1
+        print('No regressions against baseline')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
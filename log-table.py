@@ -5,29 +5,830 @@ Generates HTML and text-based tables from nested dictionary structures.
 
 from robot.api.deco import keyword, library
 from robot.api import logger
+from robot.libraries.BuiltIn import BuiltIn, RobotNotRunningError
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from itertools import chain
+import base64
+import importlib
 import json
+import os
+import re
+import threading
+import time
+import unicodedata
+import zlib
+
+# Everything else (concurrent.futures, multiprocessing, copy, html, numpy, pyarrow) is imported
+# in the code paths that use it to keep the library import cheap, see
+# bench-log-table.py --import-time.
+
+
+JSON_BACKENDS = ('orjson', 'simdjson', 'json')
+
+HTML_FORMATS = ('default', 'compact', 'compressed', 'virtual')
+
+# First column of the merged table of Log Table Diff and the styles of its markers
+DIFF_COLUMN = 'diff'
+DIFF_STYLE = ('<style>.lt-diff ins{background-color:#c8f0c8;text-decoration:none}'
+              '.lt-diff del{background-color:#f8c8c8}</style>')
+
+# Stylesheet of the compact HTML tables, logged once per suite
+COMPACT_STYLE = ('<style>.lt{border-collapse:collapse}.lt th,.lt td{text-align:center;padding:5px}'
+                 '.lt th{background-color:#d3d3d3}.lt td{background-color:#ffffe0}</style>')
+
+# Inflates a compressed table in the browser. An image that fails to load runs the
+# handler also when the message is inserted with innerHTML, which skips scripts.
+COMPRESSED_TABLE = (
+    '<div data-table="{payload}">Compressed table, needs a browser with DecompressionStream.'
+    '<img hidden src="data:," onerror="var e=this.parentNode,b=Uint8Array.from(atob(e.dataset.table),'
+    'function(c){{return c.charCodeAt(0)}});new Response(new Blob([b]).stream().pipeThrough('
+    'new DecompressionStream(\'deflate\'))).text().then(function(h){{e.innerHTML=h}})"></div>'
+)
+
+# Viewer of a virtual table. The payload holds the compact header rows, the compact HTML rows,
+# height and top-level sort keys of every record. Only the records in view are put in the
+# table, spacer rows of the estimated height stand in for the others.
+VIRTUAL_TABLE = ('<div data-table="{payload}">Virtual table, needs a browser with DecompressionStream.'
+                 '<img hidden src="data:," onerror="{script}"></div>')
+VIRTUAL_SCRIPT = (
+    "var box=this.parentNode,b=Uint8Array.from(atob(box.dataset.table),function(c){return c.charCodeAt(0)});"
+    "new Response(new Blob([b]).stream().pipeThrough(new DecompressionStream('deflate'))).text().then(function(t){"
+    "var d=JSON.parse(t),order=d.rows.map(function(r,i){return i}),shown=order,starts=[0],rowPx=0,texts=null,"
+    "sortCol=-1,asc=true,collator=new Intl.Collator(undefined,{numeric:true});"
+    "box.innerHTML='<input type=search placeholder=Search> <span></span><div style=max-height:600px;overflow:auto>'+"
+    "'<table class=lt border=1><thead>'+d.head+'</thead><tbody></tbody></table></div>';"
+    "var input=box.children[0],count=box.children[1],view=box.children[2],body=view.querySelector('tbody');"
+    "function spacer(rows){return rows>0?'<tr><td colspan='+d.columns+' style=padding:0;border:0;height:'+"
+    "rows*(rowPx||24)+'px></td></tr>':''}"
+    "function render(){var px=rowPx||24,first=Math.floor(view.scrollTop/px),"
+    "last=first+Math.ceil((view.clientHeight||600)/px)+20,lo=0,hi=shown.length;"
+    "while(lo<hi){var mid=(lo+hi)>>1;if(starts[mid+1]<=first)lo=mid+1;else hi=mid}"
+    "var html=spacer(starts[lo]),end=lo;while(end<shown.length&&starts[end]<last)html+=d.rows[shown[end++]];"
+    "body.innerHTML=html+spacer(starts[shown.length]-starts[end]);"
+    "var n=starts[end]-starts[lo];if(!rowPx&&n&&!lo){rowPx=(body.rows[n-1].getBoundingClientRect().bottom-"
+    "body.rows[0].getBoundingClientRect().top)/n||24;render()}}"
+    "function update(){var q=input.value.toLowerCase();if(q&&!texts)texts=d.rows.map(function(r){"
+    "return r.replace(/<[^>]*>/g,' ').toLowerCase()});"
+    "shown=q?order.filter(function(i){return texts[i].indexOf(q)>=0}):order;starts=[0];"
+    "shown.forEach(function(i){starts.push(starts[starts.length-1]+d.heights[i])});"
+    "count.textContent=shown.length+' of '+d.rows.length+' records';render()}"
+    "Array.prototype.forEach.call(view.querySelector('thead tr').children,function(th,col){"
+    "if(!d.sortable[col])return;th.style.cursor='pointer';th.title='Sort';th.onclick=function(){"
+    "asc=sortCol===col?!asc:true;sortCol=col;order=order.slice().sort(function(x,y){"
+    "var r=collator.compare(d.keys[x][col],d.keys[y][col]);return asc?r:-r});update()}});"
+    "input.oninput=update;view.onscroll=function(){requestAnimationFrame(render)};update()})"
+)
+
+
+# Maps the digits to '0' so that long runs of digits can be found with bytes.find
+_DIGIT_TABLE = bytes.maketrans(b'123456789', b'000000000')
+# Integers beyond 64 bits have at least 19 digits
+_WIDE_INTEGER = b'0' * 19
+# Characters of a JSON document translated at a time when looking for wide integers
+_SCAN_WINDOW = 1 << 16
+
+
+def _may_hold_wide_integers(data):
+    """Return whether a JSON document may hold integers that do not fit in 64 bits.
+
+    Runs of digits following a '.' are fractions and skipped. Long runs of digits in
+    strings give a false positive, which only costs a decode with the standard library.
+    The document is scanned in place, one window at a time, so it is never copied whole.
+    """
+    if not isinstance(data, str):
+        data = memoryview(data)
+    for start in range(0, len(data), _SCAN_WINDOW):
+        # Windows overlap by one run and the character before it
+        window = data[max(start - 20, 0):start + _SCAN_WINDOW]
+        window = window.encode('utf-8', 'surrogatepass') if isinstance(window, str) else bytes(window)
+        text = window.translate(_DIGIT_TABLE)
+        pos = text.find(_WIDE_INTEGER)
+        # A run following another digit is the rest of a fraction, and a run at the
+        # start of a later window was already seen by the window before
+        while pos >= 0 and (text[pos - 1] in b'.0' if pos else start):
+            pos = text.find(_WIDE_INTEGER, pos + 1)
+        if pos >= 0:
+            return True
+    return False
+
+
+def _load_json_backend(name):
+    """Return the name and loads function of a JSON backend, the first installed one for 'auto'."""
+    if name != 'auto' and name not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend '{name}', expected 'auto' or one of {', '.join(JSON_BACKENDS)}")
+    for backend in (JSON_BACKENDS if name == 'auto' else (name,)):
+        try:
+            module = importlib.import_module(backend)
+        except ImportError:
+            if name != 'auto':
+                raise ValueError(f"JSON backend '{name}' is not installed")
+            continue
+        return backend, module.loads
+
+
+class TableField:
+    """One header field of a TableSchema.
+
+    Attributes:
+        name: Key of the field in the data rows.
+        depth: Nesting level of the field, 1 for the top level.
+        nested: List of the nested TableField objects, or None for simple fields.
+        leaf_count: Number of leaf columns the field spans. A nested field that only ever
+            held empty lists has no nested fields and spans one blank column.
+        index: Name index of the nested fields, or None for simple fields.
+    """
+
+    __slots__ = ('name', 'depth', 'nested', 'leaf_count', 'index')
+
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth
+        self.nested = None
+        self.leaf_count = 1
+        self.index = None
+
+    def __repr__(self):
+        return f'TableField({self.name!r}, nested={self.nested!r})'
+
+
+class _Cell:
+    """One data cell of the layout model.
+
+    Simple cells hold their rendered ``value``. Nested cells are _NestedCell objects
+    holding the ``(cells, height)`` layout of every nested item in ``nested`` and their
+    total height in ``rowspan``.
+    """
+
+    __slots__ = ('value', 'leaf_count', 'nested', 'rowspan')
+
+    def __init__(self, value, leaf_count, nested=None, rowspan=1):
+        self.value = value
+        self.leaf_count = leaf_count
+        self.nested = nested
+        self.rowspan = rowspan
+
+
+class _NestedCell(_Cell):
+    """Cell of a nested list.
+
+    A cell used by several records is ``shared`` and keeps its rendered HTML rows
+    in ``html`` as a ``(compact, rows)`` tuple, and its rendered text lines in ``text``
+    as a ``(widths, block)`` tuple, see _TextBlock.
+    """
+
+    __slots__ = ('shared', 'html', 'text')
+
+    def __init__(self, leaf_count, nested, rowspan):
+        _Cell.__init__(self, '', leaf_count, nested, rowspan)
+        self.shared = False
+        self.html = None
+        self.text = None
+
+
+class _TextBlock:
+    """Rendered text lines of a shared cell, spliced into the records using it.
+
+    ``lines`` holds the row lines and the separator lines between them, alternating,
+    without the border characters of the cell's column range.
+    """
+
+    __slots__ = ('lines',)
+
+    def __init__(self, lines):
+        self.lines = lines
+
+
+class _SubtreeCache:
+    """Nested cells of the lists already extracted for one layout.
+
+    A repeated list is looked up by identity first, which skips its extraction. A list
+    with the same content as an earlier one is found by the content key of its cells
+    and replaced by the earlier cell. Either way the cell is shared, so it is measured
+    and rendered once. The cache is cleared when it holds limit lists, which bounds it
+    when records are streamed. When the first probe lists hold no repeat, the table is
+    assumed to have none and the cache stops looking.
+    """
+
+    __slots__ = ('by_identity', 'by_content', 'limit', 'probe', 'enabled', 'repeats')
+
+    def __init__(self, limit=65536, probe=256):
+        self.by_identity = {}
+        self.by_content = {}
+        self.limit = limit
+        self.probe = probe
+        self.enabled = True
+        self.repeats = 0
+
+    def get(self, value, field):
+        """Return the cell of a list extracted before for the field, or None."""
+        entry = self.by_identity.get((id(value), id(field)))
+        if entry is not None and entry[0] is value:
+            self.repeats += 1
+            entry[1].shared = True
+            return entry[1]
+        return None
+
+    def add(self, value, field, cell, item_keys):
+        """Register the cell of a list and return it, or the equal cell registered before."""
+        if len(self.by_identity) >= self.limit:
+            self.by_identity.clear()
+            self.by_content.clear()
+        content_key = (id(field), item_keys)
+        known = self.by_content.get(content_key)
+        if known is None:
+            self.by_content[content_key] = known = cell
+            if not self.repeats and len(self.by_content) >= self.probe:
+                self.enabled = False
+                self.by_identity.clear()
+                self.by_content.clear()
+                return cell
+        else:
+            self.repeats += 1
+            known.shared = True
+        # The list is kept referenced so that its id is not reused while it is cached
+        self.by_identity[(id(value), id(field))] = (value, known)
+        return known
+
+    @staticmethod
+    def cells_key(cells):
+        """Return the content key of extracted cells: the values, shared nested cells by identity."""
+        return tuple([
+            (cell.value if cell.leaf_count == 1 else (cell.value, cell.leaf_count)) if cell.nested is None
+            else id(cell)
+            for cell in cells
+        ])
+
+
+class _ColumnarTable:
+    """Flat table held column by column.
+
+    Columns are lists, NumPy arrays, pandas Series or pyarrow arrays of equal length.
+    They are only converted to strings for the rows that are actually rendered.
+    """
+
+    __slots__ = ('names', 'columns', 'length')
+
+    def __init__(self, names, columns, length):
+        self.names = names
+        self.columns = columns
+        self.length = length
+
+    @classmethod
+    def from_data(cls, data):
+        """Return a columnar table of a dict of lists, pandas DataFrame or pyarrow Table, or None."""
+        if hasattr(data, 'column_names') and hasattr(data, 'num_rows'):
+            # pyarrow Table
+            return cls(list(data.column_names), list(data.columns), data.num_rows)
+        if hasattr(data, 'columns') and hasattr(data, 'iloc'):
+            # pandas DataFrame
+            return cls([str(name) for name in data.columns], [data.iloc[:, i] for i in range(data.shape[1])],
+                       len(data))
+        if isinstance(data, dict) and data and all(not isinstance(column, (str, dict)) and hasattr(column, '__len__')
+                                                   for column in data.values()):
+            lengths = {len(column) for column in data.values()}
+            if len(lengths) > 1:
+                raise ValueError(f"All columns must have the same length, got lengths {sorted(lengths)}")
+            return cls(list(data), list(data.values()), lengths.pop())
+        return None
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, window):
+        start, stop, _ = window.indices(self.length)
+        columns = [column.iloc[start:stop] if hasattr(column, 'iloc') else column[start:stop]
+                   for column in self.columns]
+        return _ColumnarTable(self.names, columns, max(stop - start, 0))
+
+    def is_flat(self):
+        """Return True when no list column holds nested lists."""
+        return not any(isinstance(column, list) and any(isinstance(value, list) for value in column)
+                       for column in self.columns)
+
+    def to_rows(self):
+        """Return the table as a list of dictionaries."""
+        columns = [column.tolist() if hasattr(column, 'tolist') else
+                   column.to_pylist() if hasattr(column, 'to_pylist') else column for column in self.columns]
+        return [dict(zip(self.names, values)) for values in zip(*columns)]
+
+    def string_columns(self, names):
+        """Return the string values and the widest value length of the named columns."""
+        by_name = dict(zip(self.names, self.columns))
+        columns = []
+        widths = []
+        for name in names:
+            if name in by_name:
+                values, width = _string_column(by_name[name])
+            else:
+                values, width = [''] * self.length, 0
+            columns.append(values)
+            widths.append(width)
+        return columns, widths
+
+
+def _string_column(column):
+    """Convert a column to a list of strings and measure its widest value.
+
+    Lengths of NumPy, pandas and pyarrow columns are computed vectorized by their
+    own string kernels, plain lists fall back to max(map(len)).
+    """
+    if hasattr(column, 'iloc'):
+        # pandas Series
+        strings = column.astype(str)
+        width = int(strings.str.len().max()) if len(strings) else 0
+        return strings.tolist(), width
+    if hasattr(column, 'to_pylist'):
+        # pyarrow Array or ChunkedArray, nulls are rendered as empty cells
+        import pyarrow
+        import pyarrow.compute as pc
+        strings = pc.fill_null(pc.cast(column, pyarrow.string()), '')
+        width = pc.max(pc.utf8_length(strings)).as_py() or 0
+        return strings.to_pylist(), width
+    if hasattr(column, 'dtype') and hasattr(column, 'astype'):
+        # NumPy array
+        import numpy
+        strings = column.astype(str)
+        width = int(numpy.char.str_len(strings).max()) if len(strings) else 0
+        return strings.tolist(), width
+    strings = [str(value) for value in column]
+    return strings, max(map(len, strings), default=0)
+
+
+ELLIPSIS = '\u2026'
+
+
+def _char_width(char):
+    """Return the number of terminal columns a character takes."""
+    if unicodedata.combining(char):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+
+
+def _display_width(text):
+    """Return the number of terminal columns a string takes."""
+    if text.isascii():
+        return len(text)
+    return sum(map(_char_width, text))
+
+
+def _center(text, width):
+    """Center text in width terminal columns, padding like the '^' format does."""
+    padding = width - _display_width(text)
+    left = padding // 2
+    return ' ' * left + text + ' ' * (padding - left)
+
+
+def _truncate_to_width(text, width):
+    """Cut text to width terminal columns, ending it with an ellipsis."""
+    if text.isascii():
+        return text[:width - 1] + ELLIPSIS
+    used = 0
+    for end, char in enumerate(text):
+        used += _char_width(char)
+        if used > width - 1:
+            return text[:end] + ELLIPSIS
+    return text + ELLIPSIS
+
+
+def _wrap_to_width(text, width):
+    """Split text into lines of at most width terminal columns."""
+    if text.isascii():
+        return [text[start:start + width] for start in range(0, len(text), width)] or ['']
+    lines = []
+    start = used = 0
+    for end, char in enumerate(text):
+        char_width = _char_width(char)
+        if used + char_width > width and end > start:
+            lines.append(text[start:end])
+            start, used = end, 0
+        used += char_width
+    lines.append(text[start:])
+    return lines
+
+
+class _TextFormat:
+    """Width cap, wrapping and truncation of the cells of a text table."""
+
+    __slots__ = ('max_width', 'wrap', 'truncate')
+
+    def __init__(self, max_width, wrap, truncate):
+        self.max_width = max_width
+        self.wrap = wrap
+        self.truncate = truncate
+
+    @classmethod
+    def create(cls, max_col_width=None, wrap=False, truncate=None):
+        """Return the text format of the given options, or None when none is set."""
+        if max_col_width is None and not wrap and truncate is None:
+            return None
+        if max_col_width is not None and int(max_col_width) < 2:
+            raise ValueError(f"max_col_width must be at least 2, got {max_col_width}")
+        if truncate is not None and int(truncate) < 1:
+            raise ValueError(f"truncate must be at least 1, got {truncate}")
+        return cls(None if max_col_width is None else int(max_col_width), bool(wrap),
+                   None if truncate is None else int(truncate))
+
+    def fit(self, value):
+        """Return a cell value as a string, or as a tuple of lines when it is wrapped."""
+        if self.truncate is not None and len(value) > self.truncate:
+            value = value[:self.truncate - 1] + ELLIPSIS
+        if self.wrap:
+            lines = []
+            for line in value.split('\n'):
+                lines.extend(_wrap_to_width(line, self.max_width) if self.max_width else [line])
+            return lines[0] if len(lines) == 1 else tuple(lines)
+        # A line break would break the table, so it is shown as a space
+        value = value.replace('\n', ' ')
+        if self.max_width is not None and _display_width(value) > self.max_width:
+            return _truncate_to_width(value, self.max_width)
+        return value
+
+
+def _parse_columns(columns):
+    """Return the projection tree of column paths, or None when every column is kept.
+
+    Every path names a field, nested fields joined with dots (address.zip). In the tree
+    a selected field maps to None and a field with selected nested fields to their tree.
+    """
+    if columns is None:
+        return None
+    if isinstance(columns, str):
+        columns = columns.split(',')
+    tree = {}
+    for path in columns:
+        *parents, name = parts = str(path).strip().split('.')
+        if not all(parts):
+            raise ValueError(f"Invalid column path '{path}'")
+        node = tree
+        for parent in parents:
+            node = node.setdefault(parent, {})
+            if node is None:
+                # The whole parent field is already selected
+                break
+        else:
+            node[name] = None
+    return tree
+
+
+class _RowFilter:
+    """Field predicates a row must all match to be rendered."""
+
+    __slots__ = ('predicates',)
+
+    _PREDICATE = re.compile(r'^\s*([^!=]+?)\s*(!=|=)\s*(.*?)\s*$', re.DOTALL)
+
+    def __init__(self, predicates):
+        self.predicates = predicates
+
+    @classmethod
+    def create(cls, where=None):
+        """Return the filter of field=value and field!=value predicates, or None when none is given."""
+        if where is None:
+            return None
+        if isinstance(where, str):
+            where = [where]
+        predicates = []
+        for predicate in where:
+            match = cls._PREDICATE.match(str(predicate))
+            if match is None or not all(match.group(1).split('.')):
+                raise ValueError(f"Invalid where predicate '{predicate}', expected field=value or field!=value")
+            path, operator, value = match.groups()
+            predicates.append((path.split('.'), value, operator == '!='))
+        return cls(predicates)
+
+    def matches(self, row):
+        """Return whether the row matches every predicate."""
+        return all(self._has_value(row, path, value) is not negate for path, value, negate in self.predicates)
+
+    def _has_value(self, data, path, value):
+        """Return whether the field at path is rendered as value, in any record of a nested path."""
+        if not isinstance(data, dict) or path[0] not in data:
+            return False
+        field_value = data[path[0]]
+        if isinstance(field_value, list):
+            return len(path) > 1 and any(self._has_value(item, path[1:], value) for item in field_value)
+        return len(path) == 1 and str(field_value) == value
+
+
+def _text_width(value):
+    """Return the display width of a cell value, or of the widest line of a wrapped one."""
+    if type(value) is str:
+        return len(value) if value.isascii() else _display_width(value)
+    return max(map(_display_width, value))
+
+
+class TableSchema:
+    """Unified header structure of a table, inferred from its data rows.
+
+    Fields are kept in first-seen order. Every level keeps a name index next to its
+    field list, so adding a row costs time linear in the number of its keys.
+
+    With a column projection (see _parse_columns) only the selected fields are looked
+    up in the rows and they are kept in the order of the projection. The other keys
+    and their nested records are never visited.
+
+    Attributes:
+        fields: List of TableField objects of the top level.
+        max_depth: Number of header rows needed to render the structure.
+        version: Incremented whenever a row adds a field or turns a field into a nested one.
+        columns: Column projection tree, or None when every field is kept.
+    """
+
+    def __init__(self, rows=None, columns=None):
+        self.fields = []
+        self.max_depth = 1
+        self.version = 0
+        self.columns = columns
+        self._index = {}
+        if rows is not None:
+            self.add_rows(rows)
+
+    def add_rows(self, rows):
+        """Merge the structure of the given rows into the schema."""
+        for row in rows:
+            self._merge_data(row, self.fields, self._index, 1, self.columns)
+        self._annotate_leaf_columns(self.fields)
+
+    def add_row(self, row):
+        """Merge the structure of a single row into the schema."""
+        self.add_rows([row])
+
+    def _merge_data(self, data, fields, index, depth, columns=None):
+        """Recursively register the fields of a dictionary at the given level."""
+        items = data.items() if columns is None else ((key, data[key]) for key in columns if key in data)
+        for key, value in items:
+            field = index.get(key)
+            if field is None:
+                field = TableField(key, depth)
+                index[key] = field
+                if columns is None:
+                    fields.append(field)
+                else:
+                    # Keep the order of the projection even if the rows start with a later column
+                    order = list(columns)
+                    position = order.index(key)
+                    fields.insert(sum(order.index(other.name) < position for other in fields), field)
+                self.version += 1
+
+            if isinstance(value, list):
+                if field.nested is None:
+                    # A field becomes nested the first time a list value is seen
+                    field.nested = []
+                    field.index = {}
+                    self.version += 1
+                    if depth + 1 > self.max_depth:
+                        self.max_depth = depth + 1
+                nested_columns = None if columns is None else columns[key]
+                for item in value:
+                    self._merge_data(item, field.nested, field.index, depth + 1, nested_columns)
+
+    def _annotate_leaf_columns(self, structure):
+        """Store the number of leaf columns spanned by every field."""
+        total = 0
+
+        for field in structure:
+            if field.nested is None:
+                field.leaf_count = 1
+            else:
+                # A nested field without nested fields keeps one blank column
+                field.leaf_count = max(1, self._annotate_leaf_columns(field.nested))
+            total += field.leaf_count
+
+        return total
+
+
+class Table:
+    """Appendable table created by Create Table.
+
+    The schema, the layout and the HTML rows of the records are kept between the
+    Append To Table calls. As long as the schema does not change, appending a row
+    only lays out and renders that row. The text records are kept together with
+    the column widths they were rendered with.
+
+    Attributes:
+        schema: TableSchema of all rows appended so far.
+        rows: The appended rows.
+    """
+
+    def __init__(self):
+        self.schema = TableSchema()
+        self.rows = []
+        self._schema_version = 0
+        self._layout = []
+        self._html_rows = []
+        self._col_info = []
+        self._text_records = []
+        self._text_widths = None
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class TableStats:
+    """Measurements of one Log Table call.
+
+    Attributes:
+        phases: Wall time in seconds per phase: parse, filter, analyze, layout, html, text, log
+                (stream for streaming mode, where rendering and logging are interleaved).
+        total_rows: Number of rows in the input.
+        rows: Number of rendered records.
+        columns: Number of leaf columns.
+        max_depth: Number of header rows.
+        cells: Number of data cells, nested cells included (not counted with workers or stream).
+        max_record_height: Largest number of table rows taken by one record (as cells).
+        html_bytes: Size of the logged HTML in UTF-8 bytes.
+        text_bytes: Size of the logged text table in UTF-8 bytes.
+        cache_hit: True if the header structure came from the cache, None if not looked up.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.phases = {}
+        self.total_rows = 0
+        self.rows = 0
+        self.columns = 0
+        self.max_depth = 0
+        self.cells = 0
+        self.max_record_height = 0
+        self.html_bytes = 0
+        self.text_bytes = 0
+        self.cache_hit = None
+
+    @contextmanager
+    def phase(self, name):
+        """Add the wall time of the enclosed block to the given phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def as_dict(self):
+        """Return the measurements as a dictionary."""
+        return {key: value for key, value in vars(self).items() if key != 'enabled'}
+
+    def __str__(self):
+        phases = ' '.join(f'{name}={seconds:.4f}s' for name, seconds in self.phases.items())
+        return (f'Log Table stats: rows={self.rows}/{self.total_rows} columns={self.columns} '
+                f'max_depth={self.max_depth} cells={self.cells} max_record_height={self.max_record_height} '
+                f'html_bytes={self.html_bytes} text_bytes={self.text_bytes} cache_hit={self.cache_hit} | {phases}')
+
+
+class TableDiff:
+    """Row counts of one Log Table Diff call.
+
+    Attributes:
+        added: Rows only in the actual table.
+        removed: Rows only in the expected table.
+        changed: Rows with the same key and different values.
+        unchanged: Rows with the same key and the same values.
+    """
+
+    def __init__(self):
+        self.added = 0
+        self.removed = 0
+        self.changed = 0
+        self.unchanged = 0
+
+    def as_dict(self):
+        """Return the counts as a dictionary."""
+        return dict(vars(self))
+
+    def __str__(self):
+        return (f'Table diff: {self.added} added, {self.removed} removed, {self.changed} changed, '
+                f'{self.unchanged} unchanged')
 
 
 @library(scope='GLOBAL', auto_keywords=False)
 class log_table:
-    """Library for generating tables from nested dictionaries."""
+    """Library for generating tables from nested dictionaries.
+
+    The library keeps an LRU cache of header structures and rendered headers keyed by
+    the field names of the inferred header structure, so repeated calls with tables of
+    the same shape reuse the rendered HTML and text headers, flat tables included. Text
+    headers are kept for the last column widths of every structure. The cache size is
+    set with the cache_size library argument (0 disables the cache):
+
+    | Library    log-table.py    cache_size=128
+
+    JSON strings are decoded with orjson or simdjson when installed and with the
+    standard library otherwise. Documents that may hold integers beyond 64 bits are
+    always decoded with the standard library, which keeps them exact. The backend can
+    be forced with the json_backend library argument (auto, orjson, simdjson or json):
+
+    | Library    log-table.py    json_backend=json
+
+    The default HTML format of the tables is set with the html_format library argument,
+    see Log Table:
+
+    | Library    log-table.py    html_format=compact
+
+    The library is also a listener: tables rendered in the background are waited for
+    and logged at the end of every test and suite.
+    """
+
+    ROBOT_LISTENER_API_VERSION = 3
+
+    def __init__(self, cache_size=64, json_backend='auto', html_format='default'):
+        self.ROBOT_LIBRARY_LISTENER = self
+        self._cache_size = int(cache_size)
+        self._html_format = self._check_html_format(html_format)
+        self._compact_style_logged = False
+        # The backend is imported on first use
+        self._json_backend = json_backend
+        self._json_loads = None
+        self._schema_cache = OrderedDict()
+        self._header_cache = {}
+        # Guards the caches, which the render thread uses as well
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._stats_hooks = []
+        self._background_executor = None
+        self._background_renders = deque()
+        self._background_errors = []
+        self._render_state = threading.local()
 
     @keyword
-    def log_table(self, table_data, console=True):
+    def log_table(self, table_data, console=True, schema=None, stream=False, output_file=None,
+                  max_rows=None, page_size=None, offset=0, workers=1, stats=False, background=False,
+                  exact_numbers=False, max_col_width=None, wrap=False, truncate=None, html_format=None,
+                  columns=None, where=None):
         """
         Generates and logs HTML and text-based (ASCII) tables from list of dictionaries or JSON string.
 
         Args:
             table_data: List of dictionaries OR JSON string. Values can be strings or lists of dictionaries.
+                        JSON can also be given as bytes or memoryview, which is decoded without a copy.
+                        Flat tables can also be given column by column as a dictionary of lists,
+                        a pandas DataFrame or a pyarrow Table.
             console: If True, generates text table to console. If False, only HTML. Default: True
+            schema: Optional TableSchema (see Build Table Schema). When given, the header structure
+                    is taken from it as-is instead of being inferred from table_data.
+            stream: If True, rows are laid out and rendered on the fly instead of being kept in memory.
+                    The text table is written to the console chunk by chunk and is not stored in the log.
+                    Default: False
+            output_file: Optional path. When given, the HTML table is written to this file chunk by chunk
+                         and only a link to it is logged.
+            max_rows: Optional maximum number of rows to render, 0 or more. Default: all rows
+            page_size: Optional number of rows per logged table, 1 or more. Larger windows are split into several
+                       smaller log messages. Cannot be combined with output_file.
+            offset: Index of the first row to render, 0 or more. Default: 0
+            workers: Number of worker processes rendering chunks of nested tables in parallel.
+                     The output is identical to the serial rendering. Default: 1 (no workers)
+            stats: If True, returns a TableStats object with per-phase wall times, cell counts,
+                   output sizes and nesting statistics, and logs them on DEBUG level. Default: False
+            background: If True, the data is copied and the tables are rendered on a background
+                        thread, so the keyword returns immediately. The messages are logged by
+                        the next call of a logging keyword of this library, Wait For Background
+                        Tables or the end of the test at the latest. A returned TableStats object
+                        is filled in once the render finished. Default: False
+            exact_numbers: If True, numbers in JSON input are rendered exactly as written in the source
+                           (e.g. 1.10 stays 1.10 instead of 1.1). Uses the standard library decoder.
+                           Default: False
+            max_col_width: Optional maximum width of a text table column in characters. Longer values are
+                           cut and end with an ellipsis, unless wrap is set. Default: no limit
+            wrap: If True, values wider than max_col_width and values with line breaks are wrapped onto
+                  several lines of the text table instead. Default: False
+            truncate: Optional maximum number of characters of a value shown in the text table,
+                      e.g. to keep long stack traces from filling the console when wrapped. Default: no limit
+            html_format: Format of the HTML table. Default: the html_format library argument (default)
+                         - default: every cell with its attributes and the stylesheet in every table
+                         - compact: HTML-escaped values, no default attributes, the stylesheet only
+                           once per suite (tables rendered before it are shown with plain borders)
+                         - compressed: compact table stored deflated and base64 encoded, inflated
+                           by the browser when the log is opened
+                         - virtual: the records are stored as a compressed payload and a small
+                           script shows only the records scrolled into view, with search and
+                           sorting by clicking a top-level header. For tables too big for a
+                           plain <table>. Cannot be combined with stream.
+            columns: Optional list (or comma-separated string) of the fields to render, in this order.
+                     Nested fields are selected with dotted paths, e.g. address.zip. Other fields are
+                     never visited. Fails when no column matches a field of the rows. Cannot be
+                     combined with schema. Default: all fields
+            where: Optional field=value or field!=value predicate, or a list of them that must all
+                   match, selecting the rows to render. Values are compared as rendered. A dotted
+                   path matches when any of the nested records has the value. Default: all rows
 
         Output:
             - HTML table: Always logged to Robot Framework report with styled headers and cells
-            - Text table: Logged to console if console=True (ASCII art with borders)
+            - Text table: Logged to console if console=True (ASCII art with borders). Column widths
+              count the terminal columns of the values, so wide Unicode characters line up.
+              max_col_width, wrap and truncate only apply to the text table.
+            - Footer: "Showing rows X-Y of Z" under every table that does not show all rows
+            - Message: "No rows" for an empty table and "Showing 0 of Z rows" for an empty window,
+              e.g. an offset past the last row, instead of a table without rows
+
+        Rows outside the offset/max_rows window are skipped before the structure analysis,
+        so they cost nothing. The header structure is inferred from the rendered window only.
+        With where, the window and the footer count the matching rows only.
 
         The keyword automatically detects input format:
-        - If string: Parses as JSON
+        - If string, bytes or memoryview: Parses as JSON
         - If list: Uses directly
+        - If dictionary of lists, DataFrame or pyarrow Table: Renders the columns directly,
+          without converting them to rows. pyarrow values are rendered with Arrow's string cast.
 
         Examples:
             # Example 1: List of dictionaries with nested data
@@ -64,316 +865,1570 @@ class log_table:
 
             # Example 4: Skip console output
             | Log Table    ${table}    console=${False}
+
+            # Example 5: Reuse one schema for several tables of the same shape
+            | ${schema}    Build Table Schema    ${table}
+            | Log Table    ${table}    schema=${schema}
+
+            # Example 6: Stream a huge table to a file and to the console
+            | Log Table    ${table}    stream=${True}    output_file=${OUTPUT DIR}/table.html
+
+            # Example 7: Rows 1001-3000 in pages of 500 rows
+            | Log Table    ${table}    max_rows=2000    offset=1000    page_size=500
+
+            # Example 8: Measure where the time goes
+            | ${stats}    Log Table    ${table}    stats=${True}
+            | Log    ${stats.phases}
+
+            # Example 9: Log a pandas DataFrame as it is
+            | ${frame}    Evaluate    pandas.read_csv('results.csv')    modules=pandas
+            | Log Table    ${frame}
+
+            # Example 10: Do not stall a polling loop, wait for the tables at the end
+            | Log Table    ${table}    background=${True}
+            | Wait For Background Tables
+
+            # Example 11: Keep stack traces readable on the console
+            | Log Table    ${alarms}    max_col_width=60    wrap=${True}    truncate=2000
+
+            # Example 12: Keep a huge table small in output.xml
+            | Log Table    ${table}    html_format=compressed
+
+            # Example 13: Scroll, search and sort 500k rows in the log
+            | Log Table    ${table}    html_format=virtual    console=${False}
+
+            # Example 14: A few columns of the critical alarms only
+            | Log Table    ${alarms}    columns=id,severity,node.name    where=severity=CRITICAL
         """
+        table_stats = TableStats(enabled=bool(stats) or bool(self._stats_hooks))
+        text_format = _TextFormat.create(max_col_width, wrap, truncate)
+        html_format = self._html_format if html_format is None else self._check_html_format(html_format)
+        columns = _parse_columns(columns)
+        row_filter = _RowFilter.create(where)
+        if columns is not None and schema is not None:
+            raise ValueError("columns cannot be combined with schema")
+        if stream and html_format == 'virtual':
+            raise ValueError("html_format=virtual cannot be combined with stream")
+        offset = int(offset)
+        if offset < 0:
+            raise ValueError(f"offset cannot be negative, got {offset}")
+        if max_rows is not None:
+            max_rows = int(max_rows)
+            if max_rows < 0:
+                raise ValueError(f"max_rows cannot be negative, got {max_rows}")
+        if page_size is not None:
+            page_size = int(page_size)
+            if page_size < 1:
+                raise ValueError(f"page_size must be at least 1, got {page_size}")
+        self._log_background_renders()
+
+        if background:
+            # Snapshot the data so that the test can keep changing it
+            if isinstance(table_data, (bytearray, memoryview)):
+                table_data = bytes(table_data)
+            elif not isinstance(table_data, (str, bytes)):
+                import copy
+                table_data = copy.deepcopy(table_data)
+            self._submit_background_render(table_data, table_stats, console, schema, stream, output_file,
+                                           max_rows, page_size, offset, workers, exact_numbers, text_format,
+                                           html_format, columns, row_filter)
+            return table_stats if stats else None
+
+        self._log_table(table_data, table_stats, console, schema, stream, output_file,
+                        max_rows, page_size, offset, workers, exact_numbers, text_format, html_format,
+                        columns, row_filter)
+        if table_stats.enabled:
+            self._report_stats(table_stats)
+        return table_stats if stats else None
+
+    def _log_table(self, table_data, table_stats, console, schema, stream, output_file,
+                   max_rows, page_size, offset, workers, exact_numbers, text_format, html_format='default',
+                   columns=None, row_filter=None):
+        """Parse, render and log a table, filling in its stats."""
         # Auto-detect input format and convert if needed
-        if isinstance(table_data, str):
+        with table_stats.phase('parse'):
+            table_list = self._load_table_data(table_data, columnar=True, exact_numbers=exact_numbers)
+
+        # Drop the rows not matching the predicates before anything else looks at them
+        if row_filter is not None:
+            with table_stats.phase('filter'):
+                if isinstance(table_list, _ColumnarTable):
+                    table_list = table_list.to_rows()
+                table_list = [row for row in table_list if row_filter.matches(row)]
+
+        # Cut the requested window before any row is analyzed
+        total_rows = len(table_list)
+        table_stats.total_rows = total_rows
+        first_row = offset
+        last_row = total_rows if max_rows is None else min(total_rows, first_row + max_rows)
+        if first_row > 0 or last_row < total_rows:
+            table_list = table_list[first_row:last_row]
+
+        # STEP 1: Analyze the table structure (unless a prepared schema is given)
+        columnar = isinstance(table_list, _ColumnarTable)
+        if schema is None:
+            with table_stats.phase('analyze'):
+                # The columns of a columnar table give its flat schema without looking at the rows
+                schema = self._get_cached_schema([dict.fromkeys(table_list.names, '')] if columnar else table_list,
+                                                 columns, table_stats)
+            if columns is not None and not schema.fields and len(table_list):
+                raise ValueError(f"columns match no field of the table: {', '.join(columns)}")
+        if columnar and (stream or schema.max_depth > 1):
+            table_list = table_list.to_rows()
+        table_stats.max_depth = schema.max_depth
+        table_stats.columns = sum(field.leaf_count for field in schema.fields)
+
+        # STEPS 2-4: Render and log every page of the window
+        page_size = page_size or max(len(table_list), 1)
+        if output_file and page_size < len(table_list):
+            raise ValueError("page_size cannot be combined with output_file")
+
+        for page_start in range(0, max(len(table_list), 1), page_size):
+            page = table_list if page_size >= len(table_list) else table_list[page_start:page_start + page_size]
+            footer = None
+            if len(page) < total_rows:
+                footer = self._generate_window_footer(first_row + page_start, len(page), total_rows)
+            self._log_table_page(page, schema, console, stream, output_file, footer, int(workers), table_stats,
+                                 text_format, html_format)
+
+    def _submit_background_render(self, *args):
+        """Queue a Log Table call on the background render thread."""
+        if self._background_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            # A single thread keeps the tables in call order
+            self._background_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='log-table')
+        output_dir = self._get_output_dir()
+        self._background_renders.append(self._background_executor.submit(self._render_in_background, output_dir,
+                                                                          *args))
+
+    def _render_in_background(self, output_dir, table_data, table_stats, *args):
+        """Run a Log Table call on the render thread and return its queued log messages."""
+        # Robot Framework ignores messages logged from other threads, so they are
+        # queued and logged from the main thread
+        self._render_state.messages = messages = []
+        self._render_state.output_dir = output_dir
+        try:
+            self._log_table(table_data, table_stats, *args)
+        finally:
+            self._render_state.messages = None
+        return messages, table_stats
+
+    def _log_background_renders(self, timeout=None, wait=False):
+        """Log the messages of finished background renders in call order.
+
+        With wait=True the renders are waited for, at most timeout seconds.
+        Returns the number of renders still pending.
+        """
+        if wait and self._background_renders:
+            from concurrent.futures import wait as wait_for
+            wait_for(list(self._background_renders), timeout=timeout)
+
+        while self._background_renders and self._background_renders[0].done():
+            future = self._background_renders.popleft()
             try:
-                table_list = json.loads(table_data)
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON string: {str(e)}")
+                messages, table_stats = future.result()
+            except Exception as e:
+                self._background_errors.append(e)
+                continue
+            for name, args, kwargs in messages:
+                getattr(logger, name)(*args, **kwargs)
+            if table_stats.enabled:
+                self._report_stats(table_stats)
+
+        return len(self._background_renders)
+
+    def _emit(self, name, *args, **kwargs):
+        """Call the robot.api.logger function name, or queue the call on the render thread."""
+        messages = getattr(self._render_state, 'messages', None)
+        if messages is None:
+            getattr(logger, name)(*args, **kwargs)
         else:
-            table_list = table_data
-        # STEP 1: Analyze the table structure
-        header_structure, max_depth = self._analyze_table_structure(table_list)
+            messages.append((name, args, kwargs))
+
+    def _get_output_dir(self):
+        """Return the output directory of the running Robot Framework execution, if any."""
+        if getattr(self._render_state, 'messages', None) is not None:
+            return self._render_state.output_dir
+        try:
+            return BuiltIn().get_variable_value('${OUTPUT DIR}')
+        except RobotNotRunningError:
+            return None
+
+    @keyword
+    def wait_for_background_tables(self, timeout=None):
+        """
+        Waits until the tables logged with background=${True} are rendered and logs them.
+
+        Args:
+            timeout: Optional maximum time to wait in seconds. Default: wait until all are done
 
-        # STEP 2: Generate HTML table
-        html = self._generate_html_table(table_list, header_structure, max_depth)
-        logger.info(html, html=True)
+        Fails with the error of the first failed background render, or when renders are
+        still pending after the timeout. Pending renders are also waited for at the end
+        of every test.
 
-        # STEP 3: Generate text-based table (optional)
+        Examples:
+            | Wait For Background Tables    timeout=30
+        """
+        pending = self._log_background_renders(None if timeout is None else float(timeout), wait=True)
+        if self._background_errors:
+            error = self._background_errors[0]
+            self._background_errors = []
+            raise error
+        if pending:
+            raise AssertionError(f"{pending} background table(s) not rendered within {timeout} seconds")
+
+    def start_suite(self, data, result):
+        """Listener method: log the stylesheet of compact tables again in the new suite."""
+        self._compact_style_logged = False
+
+    def end_test(self, data, result):
+        """Listener method: log the background renders of the test and fail it on errors."""
+        self._log_background_renders(wait=True)
+        if self._background_errors:
+            errors, self._background_errors = self._background_errors, []
+            result.status = 'FAIL'
+            message = f"Background Log Table failed: {errors[0]}"
+            result.message = f"{result.message}\n\n{message}" if result.message else message
+
+    def end_suite(self, data, result):
+        """Listener method: log the background renders of suite setups and teardowns."""
+        self._log_background_renders(wait=True)
+        for error in self._background_errors:
+            logger.error(f"Background Log Table failed: {error}")
+        self._background_errors = []
+
+    def _log_table_page(self, table_list, schema, console, stream, output_file, footer, workers, stats,
+                        text_format=None, html_format='default'):
+        """Render and log the HTML and text tables of one page of rows."""
+        header_structure, max_depth = schema.fields, schema.max_depth
+        compact = html_format != 'default'
+        virtual = html_format == 'virtual'
+        stats.rows += len(table_list)
+
+        if not len(table_list):
+            # An empty table or window is logged as a message, not as a table without rows
+            message = footer or 'No rows'
+            html_chunks, text, footer = [f'<p>{message}</p>'], message, None
+        elif stream:
+            with stats.phase('stream'):
+                self._stream_table(table_list, schema, console, output_file, footer, text_format, html_format)
+            return
+        elif max_depth == 1:
+            # Flat tables take the columnar fast path instead of the layout model
+            with stats.phase('layout'):
+                names = [field.name for field in header_structure]
+                if isinstance(table_list, _ColumnarTable):
+                    columns, value_widths = table_list.string_columns(names)
+                else:
+                    columns, value_widths = self._extract_flat_columns(table_list, names), None
+            with stats.phase('html'):
+                if virtual:
+                    records = (self._virtual_record([_Cell(value, 1) for value in values], 1)
+                               for values in zip(*columns))
+                    html_chunks = [self._generate_virtual_table(records, header_structure, 1)]
+                else:
+                    html_chunks = [self._generate_flat_html_table(header_structure, columns, compact)]
+            with stats.phase('text'):
+                text = None
+                if console and text_format is None:
+                    text = self._generate_flat_text_table(names, columns, value_widths, header_structure)
+                    if not text.isascii():
+                        # Padding by display width is only done by the generic text renderer
+                        text = None
+                if console and text is None:
+                    layout = [([_Cell(value, 1) for value in values], 1) for values in zip(*columns)]
+                    text = self._generate_text_table(header_structure, 1, layout, text_format)
+            if stats.enabled and table_list:
+                stats.cells += len(table_list) * len(names)
+                stats.max_record_height = max(stats.max_record_height, 1)
+        elif workers > 1 and len(table_list) > 1 and not virtual:
+            html_chunks, text = self._render_in_parallel(table_list, header_structure, max_depth, console,
+                                                         workers, stats, text_format, compact)
+        else:
+            # STEP 2: Compile the layout once, shared by both renderers
+            with stats.phase('layout'):
+                layout = self._compile_layout(table_list, header_structure)
+            if virtual:
+                with stats.phase('html'):
+                    records = (self._virtual_record(cells, height) for cells, height in layout)
+                    html_chunks = [self._generate_virtual_table(records, header_structure, max_depth)]
+            else:
+                html_chunks = self._iter_html_table(layout, header_structure, max_depth, compact)
+            with stats.phase('text'):
+                text = self._generate_text_table(header_structure, max_depth, layout, text_format) if console else None
+            if stats.enabled:
+                stats.cells += self._count_cells(layout)
+                stats.max_record_height = max([stats.max_record_height] + [height for _, height in layout])
+
+        # STEP 3: Log HTML table
+        if footer:
+            html_chunks = chain(html_chunks, [f'\n<p>{footer}</p>'])
+        if output_file:
+            with stats.phase('html'):
+                self._write_chunks(output_file, html_chunks, compact)
+        else:
+            with stats.phase('html'):
+                html = ''.join(html_chunks)
+            with stats.phase('log'):
+                html = self._log_html(html, html_format)
+            if stats.enabled:
+                stats.html_bytes += len(html.encode('utf-8'))
+
+        # STEP 4: Log text-based table (optional)
         if console:
-            text = self._generate_text_table(header_structure, max_depth, table_list)
-            logger.info(f"\n{text}", also_console=True)
+            if footer:
+                text += f'\n{footer}'
+            with stats.phase('log'):
+                self._emit('info', f"\n{text}", also_console=True)
+            if stats.enabled:
+                stats.text_bytes += len(text.encode('utf-8'))
+
+    def _count_cells(self, layout):
+        """Count the data cells of a layout, nested cells included."""
+        count = 0
+        for cells, _ in layout:
+            count += len(cells)
+            for cell in cells:
+                if cell.nested is not None:
+                    count += self._count_cells(cell.nested)
+        return count
+
+    def _report_stats(self, stats):
+        """Log the measurements of a call and hand them to the registered hooks."""
+        logger.debug(str(stats))
+        for hook in self._stats_hooks:
+            try:
+                hook(stats)
+            except Exception as e:
+                logger.warn(f"Table stats hook {getattr(hook, '__name__', hook)} failed: {str(e)}")
+
+    def _render_in_parallel(self, table_list, header_structure, max_depth, console, workers, stats,
+                            text_format=None, compact=False):
+        """Render chunks of records in a process pool and join them in order.
+
+        The first round renders the HTML rows and measures the column widths of every
+        chunk, the second round renders the text rows with the merged widths.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
+
+        # Forked workers inherit the rows, only chunk boundaries are sent to them
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+        else:
+            context = multiprocessing.get_context()
+
+        chunk_size = -(-len(table_list) // (workers * 4))
+        bounds = [(start, min(start + chunk_size, len(table_list)))
+                  for start in range(0, len(table_list), chunk_size)]
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_render_worker,
+                                 initargs=(table_list, header_structure, text_format, compact)) as executor:
+            with stats.phase('html'):
+                results = list(executor.map(_render_html_chunk, bounds))
+            html_chunks = [self._generate_html_head(header_structure, max_depth, compact)]
+            html_chunks.extend(html for html, _ in results)
+            html_chunks.append('</table>')
+
+            text = None
+            if console:
+                text_started = time.perf_counter()
+                col_info = results[0][1]
+                for _, chunk_col_info in results[1:]:
+                    for col, chunk_col in zip(col_info, chunk_col_info):
+                        if chunk_col['width'] > col['width']:
+                            col['width'] = chunk_col['width']
+                self._fit_column_widths(col_info, header_structure, text_format)
+
+                text_chunks = executor.map(_render_text_chunk, [bounds + (col_info,) for bounds in bounds])
+                row_separator = self._generate_data_row_separator(col_info)
+                top_border = self._generate_top_border(col_info)
+                text = '\n'.join([top_border,
+                                  self._generate_header_rows(header_structure, max_depth, col_info, text_format),
+                                  self._generate_header_separator(col_info),
+                                  f'\n{row_separator}\n'.join(text_chunks),
+                                  top_border])
+                stats.phases['text'] = stats.phases.get('text', 0.0) + time.perf_counter() - text_started
+
+        return html_chunks, text
+
+    def _extract_flat_columns(self, table_list, names):
+        """Extract the values of a flat table column by column."""
+        return [[str(row[name]) if name in row else '' for row in table_list] for name in names]
+
+    def _generate_flat_html_table(self, header_structure, columns, compact=False):
+        """Generate the HTML table of a flat table from its columns."""
+        from html import escape
+        if compact:
+            row_template = '<tr>' + '<td>{}</td>' * len(header_structure) + '</tr>\n'
+            columns = [[escape(value, False) for value in column] for column in columns]
+        else:
+            row_template = '<tr>' + '<td rowspan="1" class="td">{}</td>' * len(header_structure) + '</tr>\n'
+        rows = ''.join(row_template.format(*values) for values in zip(*columns))
+        return self._generate_html_head(header_structure, 1, compact) + rows + '</table>'
+
+    def _generate_flat_text_table(self, names, columns, value_widths=None, header_structure=None):
+        """Generate the text table of a flat table from its columns.
+
+        value_widths are the widest value lengths of the columns when already known. The
+        header row of a cached header_structure is shared with the generic text renderer.
+        """
+        if value_widths is None:
+            value_widths = [max(map(len, column), default=0) for column in columns]
+        widths = [max(len(name), width) + 2 for name, width in zip(names, value_widths)]
+        row_template = '|' + '|'.join(f'{{:^{width}}}' for width in widths) + '|'
+        border = '+' + '+'.join('-' * width for width in widths) + '+'
+
+        header_row = self._get_text_header(header_structure, (tuple(widths), False))
+        if header_row is None:
+            header_row = row_template.format(*names)
+            if header_row.isascii():
+                # Other names are padded by display width, which only the generic renderer does
+                self._put_text_header(header_structure, (tuple(widths), False), header_row)
+        lines = [border, header_row, '+' + '+'.join('=' * width for width in widths) + '+']
+        body = f'\n{border}\n'.join(row_template.format(*values) for values in zip(*columns))
+        lines.append(body)
+        lines.append(border)
+        return '\n'.join(lines)
+
+    def _generate_window_footer(self, first_row, row_count, total_rows):
+        """Generate the footer telling which rows of the table are shown."""
+        if not row_count:
+            return f'Showing 0 of {total_rows} rows'
+        return f'Showing rows {first_row + 1}-{first_row + row_count} of {total_rows}'
+
+    def iter_html(self, table_data, schema=None, compact=False):
+        """Yield the HTML table of list of dictionaries or JSON string chunk by chunk.
+
+        The first chunk holds the style and header rows, then one chunk is yielded
+        per data record and the last chunk closes the table. A compact table has no
+        style, it uses the classes of COMPACT_STYLE.
+        """
+        table_list = self._load_table_data(table_data)
+        if schema is None:
+            schema = TableSchema(table_list)
+        layout = self._iter_layout(table_list, schema.fields)
+        return self._iter_html_table(layout, schema.fields, schema.max_depth, compact)
+
+    def iter_text(self, table_data, schema=None, max_col_width=None, wrap=False, truncate=None):
+        """Yield the text table of list of dictionaries or JSON string chunk by chunk.
+
+        Column widths are calculated in a first pass over the rows, then the header
+        and one chunk per data record are yielded. Joining the chunks with newlines
+        gives the complete table. max_col_width, wrap and truncate work like in Log Table.
+        """
+        return self._iter_text(self._load_table_data(table_data), schema,
+                               _TextFormat.create(max_col_width, wrap, truncate))
+
+    def _iter_text(self, table_list, schema, text_format):
+        """Yield the text table of a list of rows chunk by chunk."""
+        if schema is None:
+            schema = TableSchema(table_list)
+        fields = schema.fields
+        col_info = self._build_column_info(fields, self._iter_text_layout(table_list, fields, text_format),
+                                           text_format)
+        layout = self._iter_text_layout(table_list, fields, text_format)
+        return self._iter_text_table(fields, schema.max_depth, col_info, layout, text_format)
+
+    def _iter_text_layout(self, table_list, header_structure, text_format):
+        """Lazily yield the layout entries of the data rows with the text format applied."""
+        layout = self._iter_layout(table_list, header_structure)
+        if text_format is None:
+            return layout
+        return ((self._fit_cells(cells, text_format), height) for cells, height in layout)
+
+    def _stream_table(self, table_list, schema, console, output_file, footer=None, text_format=None,
+                      html_format='default'):
+        """Render the table without keeping its layout or output in memory."""
+        compact = html_format != 'default'
+        html_chunks = self.iter_html(table_list, schema, compact)
+        if footer:
+            html_chunks = chain(html_chunks, [f'\n<p>{footer}</p>'])
+        if output_file:
+            self._write_chunks(output_file, html_chunks, compact)
+        else:
+            self._log_html(''.join(html_chunks), html_format)
+
+        if console:
+            self._emit('console', '')
+            for chunk in self._iter_text(table_list, schema, text_format):
+                self._emit('console', chunk)
+            if footer:
+                self._emit('console', footer)
+
+    def _write_chunks(self, output_file, chunks, compact=False):
+        """Write chunks to a file as they are produced and log a link to it."""
+        with open(output_file, 'w', encoding='utf-8') as f:
+            if compact:
+                # The file is viewed on its own, so it always gets the stylesheet
+                f.write(COMPACT_STYLE)
+            for chunk in chunks:
+                f.write(chunk)
+        self._log_file_link(output_file)
+
+    def _log_html(self, html, html_format):
+        """Log an HTML table in the given format and return the logged message.
+
+        The stylesheet of compact tables is logged once per suite. Tables rendered in the
+        background are logged later than they are rendered, so they all carry it.
+        """
+        if html_format != 'default':
+            if html_format == 'compressed':
+                payload = base64.b64encode(zlib.compress(html.encode('utf-8'), 9)).decode('ascii')
+                html = COMPRESSED_TABLE.format(payload=payload)
+            if getattr(self._render_state, 'messages', None) is not None:
+                html = COMPACT_STYLE + html
+            elif not self._compact_style_logged:
+                html = COMPACT_STYLE + html
+                self._compact_style_logged = True
+        self._emit('info', html, html=True)
+        return html
+
+    def _generate_virtual_table(self, records, header_structure, max_depth):
+        """Generate the virtual table of (html, height, keys) records, see VIRTUAL_SCRIPT."""
+        from html import escape
+        payload = {
+            'head': self._generate_html_headers(header_structure, max_depth, True),
+            'columns': sum(field.leaf_count for field in header_structure),
+            'sortable': [field.nested is None for field in header_structure],
+            'rows': [], 'heights': [], 'keys': [],
+        }
+        for html, height, keys in records:
+            payload['rows'].append(html)
+            payload['heights'].append(height)
+            payload['keys'].append(keys)
+        data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return VIRTUAL_TABLE.format(payload=base64.b64encode(zlib.compress(data, 9)).decode('ascii'),
+                                    script=escape(VIRTUAL_SCRIPT))
+
+    def _virtual_record(self, cells, height, html=None):
+        """Return the compact HTML rows, the height and the sort keys of a record of a virtual table.
+
+        html gives the compact HTML rows of the record when they are rendered already.
+        """
+        if html is None:
+            html = self._generate_html_data_row(cells, height, True)
+        return html, height, [cell.value if cell.nested is None else '' for cell in cells]
+
+    def _check_html_format(self, html_format):
+        """Validate an html_format argument."""
+        if html_format not in HTML_FORMATS:
+            raise ValueError(f"Unknown html_format '{html_format}', expected one of {', '.join(HTML_FORMATS)}")
+        return html_format
+
+    def _log_file_link(self, output_file):
+        """Log a link to a file written next to the Robot Framework log."""
+        path = os.path.abspath(output_file)
+        output_dir = self._get_output_dir()
+        try:
+            link = os.path.relpath(path, output_dir) if output_dir else path
+        except ValueError:
+            link = path
+        self._emit('info', f'Table written to <a href="{link}">{path}</a>', html=True)
+
+    @keyword
+    def build_table_schema(self, table_data):
+        """
+        Infers the header structure of list of dictionaries or JSON string and returns it as a TableSchema.
+
+        The returned schema can be passed to Log Table with schema= to skip inference
+        for further tables with the same structure.
+
+        Examples:
+            | ${schema}    Build Table Schema    ${table}
+            | Log Table    ${table}    schema=${schema}
+        """
+        return TableSchema(self._load_table_data(table_data))
+
+    @keyword
+    def log_table_from_file(self, path, console=True, output_file=None, encoding='utf-8', exact_numbers=False,
+                            max_col_width=None, wrap=False, truncate=None, html_format=None, columns=None,
+                            where=None):
+        """
+        Generates and logs HTML and text-based (ASCII) tables from a JSON array or JSON Lines file.
+
+        Args:
+            path: Path to a file holding a JSON array of dictionaries or one dictionary per line (NDJSON).
+            console: If True, writes the text table to console chunk by chunk. Default: True
+            output_file: Optional path. When given, the HTML table is written to this file chunk by chunk
+                         and only a link to it is logged.
+            encoding: Encoding of the file. Default: utf-8
+            exact_numbers: If True, numbers are rendered exactly as written in the file. Default: False
+            max_col_width: Optional maximum width of a text table column, see Log Table.
+            wrap: If True, wraps long values in the text table instead of cutting them, see Log Table.
+            truncate: Optional maximum number of characters of a value in the text table, see Log Table.
+            html_format: Format of the HTML table (default, compact, compressed or virtual), see Log Table.
+            columns: Optional fields to render, with dotted paths for nested fields, see Log Table.
+            where: Optional field=value or field!=value predicates selecting the records, see Log Table.
+
+        The file is read twice with an incremental parser and is never loaded as a whole:
+        the first pass infers the header structure and the column widths, the second pass
+        renders the tables. Only one record is held in memory at a time, so huge exports
+        should be combined with output_file, otherwise the whole HTML table is still built
+        for the log message.
+
+        Examples:
+            | Log Table From File    ${CURDIR}/alarms.json
+            | Log Table From File    ${CURDIR}/alarms.ndjson    output_file=${OUTPUT DIR}/alarms.html
+            | Log Table From File    ${CURDIR}/alarms.ndjson    columns=id,text    where=severity!=INFO
+        """
+        text_format = _TextFormat.create(max_col_width, wrap, truncate)
+        html_format = self._html_format if html_format is None else self._check_html_format(html_format)
+        compact = html_format != 'default'
+        virtual_records = [] if html_format == 'virtual' else None
+        row_filter = _RowFilter.create(where)
+        self._log_background_renders()
+
+        def iter_records():
+            records = self._iter_json_records(path, encoding, exact_numbers)
+            return records if row_filter is None else filter(row_filter.matches, records)
+
+        # PASS 1: Infer the header structure and measure the values
+        schema = TableSchema(columns=_parse_columns(columns))
+        value_widths = {}
+        record_count = 0
+        for record in iter_records():
+            schema._merge_data(record, schema.fields, schema._index, 1, schema.columns)
+            self._measure_values(record, schema._index, value_widths, text_format)
+            record_count += 1
+        schema._annotate_leaf_columns(schema.fields)
+        if schema.columns is not None and not schema.fields and record_count:
+            raise ValueError(f"columns match no field of the table: {', '.join(schema.columns)}")
+
+        if not record_count:
+            # An empty file or selection is logged as a message, like an empty Log Table
+            if output_file:
+                self._write_chunks(output_file, ['<p>No rows</p>'])
+            else:
+                self._log_html('<p>No rows</p>', html_format)
+            if console:
+                self._emit('console', '\nNo rows')
+            return
+
+        header_structure, max_depth = schema.fields, schema.max_depth
+        col_info = self._build_column_info_from_widths(header_structure, value_widths)
+        self._fit_column_widths(col_info, header_structure, text_format)
+
+        # PASS 2: Render both tables record by record
+        html_chunks = []
+        html_file = open(output_file, 'w', encoding='utf-8') if output_file else None
+        write_html = html_file.write if html_file else html_chunks.append
+        try:
+            if html_file and compact:
+                html_file.write(COMPACT_STYLE)
+            if virtual_records is None:
+                write_html(self._generate_html_head(header_structure, max_depth, compact))
+            if console:
+                self._emit('console', '')
+                self._emit('console', self._generate_top_border(col_info))
+                self._emit('console', self._generate_header_rows(header_structure, max_depth, col_info, text_format))
+                self._emit('console', self._generate_header_separator(col_info))
+
+            for row_idx, (cells, height) in enumerate(self._iter_layout(iter_records(), header_structure)):
+                if virtual_records is None:
+                    write_html(self._generate_html_data_row(cells, height, compact))
+                else:
+                    virtual_records.append(self._virtual_record(cells, height))
+                if console:
+                    if row_idx:
+                        self._emit('console', self._generate_data_row_separator(col_info))
+                    if text_format is not None:
+                        cells = self._fit_cells(cells, text_format)
+                    self._emit('console', self._generate_text_record(cells, height, col_info))
+
+            if virtual_records is None:
+                write_html('</table>')
+            else:
+                write_html(self._generate_virtual_table(virtual_records, header_structure, max_depth))
+            if console:
+                self._emit('console', self._generate_top_border(col_info))
+        finally:
+            if html_file:
+                html_file.close()
+
+        if output_file:
+            self._log_file_link(output_file)
+        else:
+            self._log_html(''.join(html_chunks), html_format)
+
+    @keyword
+    def create_table(self):
+        """
+        Creates an empty appendable table and returns it.
+
+        Rows are added with Append To Table and the table is logged with Flush Table.
+        This is much cheaper than collecting the rows in a list and calling Log Table
+        again and again, because already rendered rows are kept.
+
+        Examples:
+            | ${table}    Create Table
+            | FOR    ${i}    IN RANGE    10
+            |     ${alarms}    Get Alarms
+            |     &{row}    Create Dictionary    iteration=${i}    alarms=${alarms}
+            |     Append To Table    ${table}    ${row}
+            | END
+            | Flush Table    ${table}
+        """
+        return Table()
+
+    @keyword
+    def append_to_table(self, table, *rows):
+        """
+        Appends rows to a table created with Create Table.
+
+        Args:
+            table: Table returned by Create Table.
+            rows: Dictionaries to append, or lists of them.
+
+        The schema and the column widths are updated incrementally. Only the new rows are
+        laid out and rendered, unless they add fields to the schema, in which case all
+        rows are rendered again with the new columns.
+
+        Examples:
+            | Append To Table    ${table}    ${row1}    ${row2}
+        """
+        new_rows = []
+        for row in rows:
+            if isinstance(row, list):
+                new_rows.extend(row)
+            else:
+                new_rows.append(row)
+
+        table.schema.add_rows(new_rows)
+        table.rows.extend(new_rows)
+        fields = table.schema.fields
+        # Rows are rendered in the HTML format of the library, virtual tables reuse compact rows
+        compact = self._html_format != 'default'
+
+        if table.schema.version != table._schema_version:
+            # The columns changed, so every row is laid out again
+            table._schema_version = table.schema.version
+            table._layout = self._compile_layout(table.rows, fields)
+            table._html_rows = [self._generate_html_data_row(cells, height, compact)
+                                for cells, height in table._layout]
+            table._col_info = self._measure_column_info(fields, table._layout)
+            table._text_records = []
+            table._text_widths = None
+            return
+
+        for row in new_rows:
+            cells, height = self._extract_row_cells(row, fields)
+            table._layout.append((cells, height))
+            table._html_rows.append(self._generate_html_data_row(cells, height, compact))
+            self._update_column_widths(table._col_info, cells, 0)
+
+    @keyword
+    def flush_table(self, table, console=True):
+        """
+        Logs all rows appended to a table so far as HTML and text tables.
+
+        Args:
+            table: Table returned by Create Table.
+            console: If True, generates text table to console. If False, only HTML. Default: True
+
+        Rows rendered by earlier flushes are reused. Text rows are only rendered again
+        when the column widths changed since the last flush. The HTML table has the format
+        of the html_format library argument.
+
+        Examples:
+            | Flush Table    ${table}    console=${False}
+        """
+        self._log_background_renders()
+        fields, max_depth = table.schema.fields, table.schema.max_depth
+        if self._html_format == 'virtual':
+            records = (self._virtual_record(cells, height, html)
+                       for (cells, height), html in zip(table._layout, table._html_rows))
+            html = self._generate_virtual_table(records, fields, max_depth)
+        else:
+            html = ''.join([self._generate_html_head(fields, max_depth, self._html_format != 'default')]
+                           + table._html_rows + ['</table>'])
+        self._log_html(html, self._html_format)
+
+        if console:
+            col_info = [dict(col) for col in table._col_info] or self._extract_leaf_columns(fields)
+            self._fit_column_widths(col_info, fields, None)
+            widths = tuple(col['width'] for col in col_info)
+            if widths != table._text_widths:
+                table._text_widths = widths
+                table._text_records = []
+            for cells, height in table._layout[len(table._text_records):]:
+                table._text_records.append(self._generate_text_record(cells, height, col_info))
+
+            top_border = self._generate_top_border(col_info)
+            row_separator = self._generate_data_row_separator(col_info)
+            text = '\n'.join([top_border,
+                              self._generate_header_rows(fields, max_depth, col_info),
+                              self._generate_header_separator(col_info),
+                              f'\n{row_separator}\n'.join(table._text_records),
+                              top_border])
+            self._emit('info', f"\n{text}", also_console=True)
+
+    @keyword
+    def log_table_diff(self, expected, actual, key, console=True, show_unchanged=False, exact_numbers=False):
+        """
+        Logs one table with the differences between an expected and an actual table.
+
+        Args:
+            expected: Expected rows, in any format accepted by Log Table.
+            actual: Actual rows, in any format accepted by Log Table.
+            key: Field identifying a row, or a list (or comma-separated string) of fields of a
+                 composite key. Every key must be unique within each table. Key fields are
+                 top-level fields, dotted paths are not supported since a nested field has
+                 one value per item.
+            console: If True, also logs the text table to console. Default: True
+            show_unchanged: If True, unchanged rows are shown too. Default: False, every run of
+                            unchanged rows is collapsed into one "N unchanged rows" row.
+            exact_numbers: If True, numbers in JSON input are compared as written. Default: False
+
+        The expected rows are indexed by key, so the rows are aligned in linear time and may
+        be in any order. The merged table follows the actual rows, a removed row comes after
+        the row before it in the expected table. Its first column marks added (+), removed (-)
+        and changed (~) rows. It is named diff, or diff_1, diff_2 and so on when the tables
+        have a diff field. Values are compared as rendered and nested lists item by item.
+        When both tables are empty only the counts are logged.
+
+        In the HTML table added values are green and removed values red and struck through,
+        a changed value shows both. The text table shows a changed value as "expected -> actual"
+        and the values of added and removed nested items with a + or - prefix.
+
+        With the html_format library argument compressed the HTML table is compressed. The
+        other formats log it with the default markup, since compact cells would escape the
+        marks of the changed values.
+
+        Returns a TableDiff with the number of added, removed, changed and unchanged rows.
+
+        Examples:
+            | ${diff}    Log Table Diff    ${expected}    ${actual}    key=id
+            | Should Be Equal As Integers    ${diff.changed}    0
+            | Log Table Diff    ${before}    ${after}    key=node,port    show_unchanged=${True}
+        """
+        self._log_background_renders()
+        expected_rows = self._load_table_data(expected, exact_numbers=exact_numbers)
+        actual_rows = self._load_table_data(actual, exact_numbers=exact_numbers)
+        key_fields = key.split(',') if isinstance(key, str) else list(key)
+        diff = TableDiff()
+
+        # Hash index of the expected rows, then the matching expected row of every actual row
+        expected_index = {}
+        for position, row in enumerate(expected_rows):
+            row_key = self._diff_key(row, key_fields, 'expected')
+            if row_key in expected_index:
+                raise ValueError(f"Duplicate key {', '.join(row_key)} in the expected table")
+            expected_index[row_key] = position
+        matches = []
+        matched = [False] * len(expected_rows)
+        seen = set()
+        for row in actual_rows:
+            row_key = self._diff_key(row, key_fields, 'actual')
+            if row_key in seen:
+                raise ValueError(f"Duplicate key {', '.join(row_key)} in the actual table")
+            seen.add(row_key)
+            position = expected_index.get(row_key)
+            if position is not None:
+                matched[position] = True
+            matches.append(position)
+
+        statuses, html_rows, text_rows = [], [], []
+        unchanged_run = 0
+
+        def collapse_unchanged():
+            nonlocal unchanged_run
+            if unchanged_run:
+                label = f'{unchanged_run} unchanged row' + ('s' if unchanged_run > 1 else '')
+                statuses.append('=')
+                html_rows.append({key_fields[0]: f'<i>{label}</i>'})
+                text_rows.append({key_fields[0]: label})
+                unchanged_run = 0
+
+        def add_row(status, html_row, text_row):
+            collapse_unchanged()
+            statuses.append(status)
+            html_rows.append(html_row)
+            text_rows.append(text_row)
+
+        def add_removed(end):
+            nonlocal next_expected
+            for position in range(next_expected, end):
+                if not matched[position]:
+                    diff.removed += 1
+                    add_row('-', *self._mark_diff_record(expected_rows[position], 'del'))
+            next_expected = max(next_expected, end)
+
+        next_expected = 0
+        for row, position in zip(actual_rows, matches):
+            if position is None:
+                diff.added += 1
+                add_row('+', *self._mark_diff_record(row, 'ins'))
+                continue
+
+            add_removed(position)
+            next_expected = max(next_expected, position + 1)
+            expected_row = expected_rows[position]
+            if expected_row != row:
+                html_row, text_row, changed = self._diff_records(expected_row, row)
+                if changed:
+                    diff.changed += 1
+                    add_row('~', html_row, text_row)
+                    continue
+            diff.unchanged += 1
+            if show_unchanged:
+                add_row('', *self._mark_diff_record(row))
+            else:
+                unchanged_run += 1
+        add_removed(len(expected_rows))
+        collapse_unchanged()
+
+        if not statuses:
+            self._emit('info', f'{diff}, both tables are empty', also_console=console)
+            return diff
+
+        # The status column gets a name that no data field has
+        names = set()
+        for row in text_rows:
+            names.update(row)
+        marker, suffix = DIFF_COLUMN, 0
+        while marker in names:
+            suffix += 1
+            marker = f'{DIFF_COLUMN}_{suffix}'
+        html_statuses = {'+': '<ins>+</ins>', '-': '<del>-</del>'}
+        html_rows = [{marker: html_statuses.get(status, status), **row} for status, row in zip(statuses, html_rows)]
+        text_rows = [{marker: status, **row} for status, row in zip(statuses, text_rows)]
+
+        schema = TableSchema(text_rows)
+        html_layout = self._compile_layout(html_rows, schema.fields)
+        html = self._generate_html_table(html_layout, schema.fields, schema.max_depth)
+        # The cells hold <ins> and <del> markup, which compact tables would escape
+        self._log_html(f'{diff}<div class="lt-diff">{DIFF_STYLE}{html}</div>',
+                       'compressed' if self._html_format == 'compressed' else 'default')
+        if console:
+            text_layout = self._compile_layout(text_rows, schema.fields)
+            text = self._generate_text_table(schema.fields, schema.max_depth, text_layout)
+            self._emit('info', f'\n{diff}\n{text}', also_console=True)
+        return diff
+
+    def _diff_key(self, row, key_fields, side):
+        """Return the key of a row as a tuple of rendered values."""
+        try:
+            return tuple(str(row[field]) for field in key_fields)
+        except KeyError as e:
+            raise ValueError(f"Row of the {side} table has no key field {e}: {row}")
+
+    def _diff_records(self, expected, actual):
+        """Merge two records with the same key into HTML and text records marking the changes.
+
+        Returns the HTML record, the text record and whether any value changed.
+        """
+        from html import escape
+        html_record, text_record = {}, {}
+        changed = False
+
+        for name in chain(expected, [name for name in actual if name not in expected]):
+            expected_value = expected.get(name)
+            actual_value = actual.get(name)
+            if isinstance(expected_value, list) and isinstance(actual_value, list):
+                html_record[name], text_record[name], items_changed = self._diff_items(expected_value,
+                                                                                     actual_value)
+                changed = changed or items_changed
+            elif (name in expected and name in actual and not isinstance(expected_value, list)
+                  and not isinstance(actual_value, list) and str(expected_value) == str(actual_value)):
+                html_record[name] = escape(str(actual_value), False)
+                text_record[name] = str(actual_value)
+            else:
+                changed = True
+                if name not in expected and isinstance(actual_value, list):
+                    html_record[name], text_record[name] = self._mark_diff_items(actual_value, 'ins')
+                elif name not in actual and isinstance(expected_value, list):
+                    html_record[name], text_record[name] = self._mark_diff_items(expected_value, 'del')
+                else:
+                    old = str(expected_value) if name in expected else ''
+                    new = str(actual_value) if name in actual else ''
+                    html_record[name] = ((f'<del>{escape(old, False)}</del>' if name in expected else '') +
+                                         (f'<ins>{escape(new, False)}</ins>' if name in actual else ''))
+                    text_record[name] = f'{old} -> {new}'
+
+        return html_record, text_record, changed
+
+    def _diff_items(self, expected_items, actual_items):
+        """Merge two nested lists item by item into HTML and text lists marking the changes."""
+        html_items, text_items = [], []
+        changed = len(expected_items) != len(actual_items)
+
+        for expected_item, actual_item in zip(expected_items, actual_items):
+            html_item, text_item, item_changed = self._diff_records(expected_item, actual_item)
+            html_items.append(html_item)
+            text_items.append(text_item)
+            changed = changed or item_changed
+        for item in actual_items[len(expected_items):]:
+            html_item, text_item = self._mark_diff_record(item, 'ins', '+ ')
+            html_items.append(html_item)
+            text_items.append(text_item)
+        for item in expected_items[len(actual_items):]:
+            html_item, text_item = self._mark_diff_record(item, 'del', '- ')
+            html_items.append(html_item)
+            text_items.append(text_item)
+
+        return html_items, text_items, changed
+
+    def _mark_diff_record(self, record, tag=None, prefix=''):
+        """Return HTML and text records of a record, with every value in tag and prefixed in text."""
+        from html import escape
+        html_record, text_record = {}, {}
+
+        for name, value in record.items():
+            if isinstance(value, list):
+                html_record[name], text_record[name] = self._mark_diff_items(value, tag, prefix)
+            else:
+                value = str(value)
+                html_record[name] = f'<{tag}>{escape(value, False)}</{tag}>' if tag else escape(value, False)
+                text_record[name] = prefix + value
+
+        return html_record, text_record
 
-    def _analyze_table_structure(self, table_list):
-        """Analyze all data rows to build a unified header structure."""
-        header_structure = []
-        max_depth = 1
+    def _mark_diff_items(self, items, tag=None, prefix=''):
+        """Return HTML and text lists of the nested items of an added, removed or unchanged record."""
+        marked = [self._mark_diff_record(item, tag, prefix) for item in items]
+        return [html for html, _ in marked], [text for _, text in marked]
 
-        for row in table_list:
-            current_structure = self._extract_structure(row, 1)
-            header_structure = self._merge_structures(header_structure, current_structure)
-            row_depth = self._calculate_depth(current_structure)
-            if row_depth > max_depth:
-                max_depth = row_depth
+    @keyword
+    def register_table_stats_hook(self, hook):
+        """
+        Registers a hook that receives the TableStats of every following Log Table call.
 
-        return header_structure, max_depth
+        Args:
+            hook: Callable taking a TableStats object, or its import path as "module.function".
 
-    def _extract_structure(self, data, depth):
-        """Recursively extract field structure from a dictionary."""
-        structure = []
+        Registering a hook turns the measurements on for every call, also without stats=${True}.
+        A failing hook is reported as a warning and does not fail the keyword.
+
+        Examples:
+            | Register Table Stats Hook    my_metrics.collect_table_stats
+        """
+        if isinstance(hook, str):
+            module_name, _, function_name = hook.rpartition('.')
+            hook = getattr(importlib.import_module(module_name), function_name)
+        if not callable(hook):
+            raise ValueError(f"Table stats hook is not callable: {hook}")
+        self._stats_hooks.append(hook)
+
+    @keyword
+    def get_table_cache_info(self):
+        """
+        Returns statistics of the header structure cache as a dictionary.
 
+        The dictionary has the keys hits, misses, hit_rate, size and max_size.
+
+        Examples:
+            | ${info}    Get Table Cache Info
+            | Log    ${info}[hit_rate]
+        """
+        with self._cache_lock:
+            lookups = self._cache_hits + self._cache_misses
+            return {
+                'hits': self._cache_hits,
+                'misses': self._cache_misses,
+                'hit_rate': self._cache_hits / lookups if lookups else 0.0,
+                'size': len(self._schema_cache),
+                'max_size': self._cache_size
+            }
+
+    @keyword
+    def clear_table_cache(self):
+        """
+        Empties the header structure cache and resets its statistics.
+
+        Examples:
+            | Clear Table Cache
+        """
+        with self._cache_lock:
+            self._schema_cache.clear()
+            self._header_cache.clear()
+            self._cache_hits = 0
+            self._cache_misses = 0
+
+    def _get_cached_schema(self, table_list, columns=None, table_stats=None):
+        """Return the schema of the rows, reusing a cached one with the same structure.
+
+        The schema is always inferred from the rows, which is exact and costs one walk over
+        their keys. Only its fields are hashed for the lookup, so a hit costs nearly nothing
+        and keeps the rendered headers of the cached structure. The lookup is recorded in
+        the cache_hit of table_stats, when given.
+        """
+        schema = TableSchema(table_list, columns)
+        if table_stats is not None:
+            table_stats.cache_hit = False
+        if self._cache_size <= 0:
+            return schema
+
+        signature = self._schema_signature(schema.fields)
+        with self._cache_lock:
+            cached = self._schema_cache.get(signature)
+            if cached is not None:
+                if table_stats is not None:
+                    table_stats.cache_hit = True
+                self._cache_hits += 1
+                self._schema_cache.move_to_end(signature)
+                return cached
+
+            self._cache_misses += 1
+            self._schema_cache[signature] = schema
+            self._header_cache[id(schema.fields)] = {}
+            if len(self._schema_cache) > self._cache_size:
+                _, evicted = self._schema_cache.popitem(last=False)
+                del self._header_cache[id(evicted.fields)]
+        return schema
+
+    def _schema_signature(self, fields):
+        """Return the field names of a header structure, nested fields with their own signature."""
+        return tuple(field.name if field.nested is None else (field.name, self._schema_signature(field.nested))
+                     for field in fields)
+
+    def _load_table_data(self, table_data, columnar=False, exact_numbers=False):
+        """Return the list of rows, parsing JSON strings when needed.
+
+        Column-oriented data is returned as a _ColumnarTable when columnar is True
+        and the table is flat, otherwise it is converted to rows.
+        """
+        if isinstance(table_data, (str, bytes, bytearray, memoryview)):
+            try:
+                table_data = self._decode_json(table_data, exact_numbers)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON string: {str(e)}")
+        if isinstance(table_data, list):
+            return table_data
+
+        table = _ColumnarTable.from_data(table_data)
+        if table is None:
+            return table_data
+        return table if columnar and table.is_flat() else table.to_rows()
+
+    def _decode_json(self, data, exact_numbers=False):
+        """Decode a JSON document from str, bytes or memoryview with the configured backend."""
+        if exact_numbers:
+            # Only the standard library decoder can keep the numbers as written
+            return json.loads(bytes(data) if isinstance(data, memoryview) else data, parse_float=str, parse_int=str)
+
+        if self._json_loads is None:
+            self._json_backend, self._json_loads = _load_json_backend(self._json_backend)
+        if self._json_backend != 'json' and _may_hold_wide_integers(data):
+            # The fast backends turn integers beyond 64 bits into floats or reject them,
+            # the standard library keeps them exact
+            return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+        try:
+            return self._json_loads(data)
+        except (ValueError, TypeError):
+            if self._json_backend == 'json':
+                raise
+            # The standard library also decodes what the fast backends reject, like NaN,
+            # and raises its own errors for invalid documents
+            return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+    def _iter_json_records(self, path, encoding='utf-8', exact_numbers=False, chunk_size=65536):
+        """Incrementally yield the records of a JSON array or JSON Lines file."""
+        decoder = json.JSONDecoder(parse_float=str, parse_int=str) if exact_numbers else json.JSONDecoder()
+        whitespace = re.compile(r'[\s,]*')
+
+        with open(path, encoding=encoding) as f:
+            buffer = f.read(chunk_size)
+            pos = whitespace.match(buffer).end()
+
+            if buffer[pos:pos + 1] != '[':
+                # JSON Lines: one record per line
+                f.seek(0)
+                for line_no, line in enumerate(f, 1):
+                    if line.strip():
+                        try:
+                            yield self._decode_json(line, exact_numbers)
+                        except json.JSONDecodeError as e:
+                            raise ValueError(f"Invalid JSON in {path} line {line_no}: {str(e)}")
+                return
+
+            pos += 1
+            eof = False
+            while True:
+                pos = whitespace.match(buffer, pos).end()
+                if buffer[pos:pos + 1] == ']':
+                    return
+                try:
+                    if pos == len(buffer):
+                        raise json.JSONDecodeError('Expecting value', buffer, pos)
+                    record, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError as e:
+                    if eof:
+                        raise ValueError(f"Invalid JSON in {path}: {str(e)}")
+                    # The record continues past the buffer: drop the consumed part and read on,
+                    # at least doubling the buffer so that huge records are parsed in linear time
+                    buffer = buffer[pos:]
+                    more = f.read(max(chunk_size, len(buffer)))
+                    eof = not more
+                    buffer += more
+                    pos = 0
+                    continue
+                yield record
+
+    def _measure_values(self, data, index, value_widths, text_format=None):
+        """Track the widest value of every simple field of a record, keyed by field id."""
         for key, value in data.items():
+            field = index.get(key)
+            if field is None:
+                # Not a selected column
+                continue
             if isinstance(value, list):
-                # Nested data
-                nested_structure = []
                 for item in value:
-                    item_structure = self._extract_structure(item, depth + 1)
-                    nested_structure = self._merge_structures(nested_structure, item_structure)
-                field_info = {'name': key, 'nested': nested_structure, 'depth': depth}
-            else:
-                # Simple data
-                field_info = {'name': key, 'nested': None, 'depth': depth}
-
-            structure.append(field_info)
-
-        return structure
-
-    def _merge_structures(self, base_structure, new_structure):
-        """Merge two structure lists to create a unified structure."""
-        if not base_structure:
-            return new_structure
-
-        merged = []
-
-        # Process each field from new_structure
-        for new_field in new_structure:
-            found = False
-            merged_field = None
-
-            for base_field in base_structure:
-                if base_field['name'] == new_field['name']:
-                    found = True
-                    if new_field['nested'] is not None and base_field['nested'] is not None:
-                        merged_nested = self._merge_structures(base_field['nested'], new_field['nested'])
-                        merged_field = {'name': base_field['name'], 'nested': merged_nested, 'depth': base_field['depth']}
-                    elif new_field['nested'] is not None:
-                        merged_field = new_field
-                    else:
-                        merged_field = base_field
-                    break
-
-            if not found:
-                merged.append(new_field)
-            elif merged_field is not None:
-                if not any(item['name'] == merged_field['name'] for item in merged):
-                    merged.append(merged_field)
-
-        # Add fields from base_structure that weren't in new_structure
-        for base_field in base_structure:
-            if not any(item['name'] == base_field['name'] for item in merged):
-                merged.append(base_field)
-
-        return merged
-
-    def _calculate_depth(self, structure):
-        """Calculate maximum nesting depth in the structure."""
-        max_depth = 1
+                    self._measure_values(item, field.index, value_widths, text_format)
+            elif not field.nested:
+                value = str(value)
+                value_len = _text_width(value if text_format is None else text_format.fit(value)) + 2
+                if value_len > value_widths.get(id(field), 0):
+                    value_widths[id(field)] = value_len
+
+    def _build_column_info_from_widths(self, structure, value_widths):
+        """Build column info from value widths measured per field."""
+        col_info = []
 
         for field in structure:
-            if field['nested'] is not None:
-                nested_depth = self._calculate_depth(field['nested'])
-                total_depth = field['depth'] + nested_depth
-                if total_depth > max_depth:
-                    max_depth = total_depth
+            if not field.nested:
+                width = max(_display_width(field.name) + 2, value_widths.get(id(field), 0))
+                col_info.append({'name': field.name, 'width': width})
+            else:
+                col_info.extend(self._build_column_info_from_widths(field.nested, value_widths))
+
+        return col_info
+
+    def _compile_layout(self, table_list, header_structure):
+        """Walk every data row once and build the layout shared by the renderers.
 
-        return max_depth
+        Each layout entry is a ``(cells, height)`` tuple where ``height`` is the
+        number of table rows the record occupies. Repeated nested lists share one
+        cell, see _SubtreeCache.
+        """
+        return list(self._iter_layout(table_list, header_structure))
+
+    def _iter_layout(self, table_list, header_structure):
+        """Lazily yield the layout entries of the data rows."""
+        subtrees = _SubtreeCache()
+        for row_data in table_list:
+            yield self._extract_row_cells(row_data, header_structure, subtrees)
 
-    def _generate_html_table(self, table_list, header_structure, max_depth):
+    def _generate_html_table(self, layout, header_structure, max_depth, compact=False):
         """Generate HTML table with CSS classes."""
-        # CSS styles
-        style = '<style>.th{background-color:#d3d3d3;text-align:center}.td{background-color:#ffffe0;text-align:center}</style>'
-        html = f'{style}<table border="1" cellpadding="5" cellspacing="0" style="border-collapse:collapse;">\n'
+        return ''.join(self._iter_html_table(layout, header_structure, max_depth, compact))
 
-        # Generate headers
-        html += self._generate_html_headers(header_structure, max_depth)
+    def _iter_html_table(self, layout, header_structure, max_depth, compact=False):
+        """Yield the HTML table: style and headers, one chunk per record, closing tag."""
+        yield self._generate_html_head(header_structure, max_depth, compact)
 
         # Generate data rows
-        for row_data in table_list:
-            html += self._generate_html_data_row(row_data, header_structure)
+        for cells, height in layout:
+            yield self._generate_html_data_row(cells, height, compact)
+
+        yield '</table>'
+
+    def _generate_html_head(self, header_structure, max_depth, compact=False):
+        """Generate the style, the opening table tag and the header rows.
 
-        html += '</table>'
+        The compact head has no style, its table uses the classes of COMPACT_STYLE.
+        """
+        cache_key = 'compact_head' if compact else 'html_head'
+        cached = self._header_cache.get(id(header_structure))
+        if cached is not None:
+            html = cached.get(cache_key)
+            if html is not None:
+                return html
+
+        if compact:
+            html = '<table class="lt" border="1">\n'
+        else:
+            # CSS styles
+            style = '<style>.th{background-color:#d3d3d3;text-align:center}.td{background-color:#ffffe0;text-align:center}</style>'
+            html = f'{style}<table border="1" cellpadding="5" cellspacing="0" style="border-collapse:collapse;">\n'
+
+        # Generate headers
+        html += self._generate_html_headers(header_structure, max_depth, compact)
+        if cached is not None:
+            cached[cache_key] = html
         return html
 
-    def _generate_html_headers(self, header_structure, max_depth):
+    def _generate_html_headers(self, header_structure, max_depth, compact=False):
         """Generate HTML header rows."""
         html = ''
         for level in range(max_depth):
             html += '<tr>'
-            html += self._generate_html_header_level(header_structure, level, 1, max_depth)
+            html += self._generate_html_header_level(header_structure, level, 1, max_depth, compact)
             html += '</tr>\n'
         return html
 
-    def _generate_html_header_level(self, structure, target_level, current_level, max_depth):
+    def _generate_html_header_level(self, structure, target_level, current_level, max_depth, compact=False):
         """Generate HTML headers at specific level."""
+        from html import escape
         html = ''
 
         for field in structure:
             if current_level == target_level + 1:
-                colspan = self._count_leaf_columns(field)
-                rowspan = 1 if field['nested'] is not None else max_depth - current_level + 1
-                html += f'<th rowspan="{rowspan}" colspan="{colspan}" class="th">{field["name"]}</th>'
-            elif field['nested'] is not None and current_level < target_level + 1:
-                html += self._generate_html_header_level(field['nested'], target_level, current_level + 1, max_depth)
+                colspan = field.leaf_count
+                rowspan = 1 if field.nested else max_depth - current_level + 1
+                if compact:
+                    # Spans of 1 are the default and left out
+                    rowspan_attr = f' rowspan="{rowspan}"' if rowspan > 1 else ''
+                    colspan_attr = f' colspan="{colspan}"' if colspan > 1 else ''
+                    html += f'<th{rowspan_attr}{colspan_attr}>{escape(field.name, False)}</th>'
+                else:
+                    html += f'<th rowspan="{rowspan}" colspan="{colspan}" class="th">{field.name}</th>'
+            elif field.nested is not None and current_level < target_level + 1:
+                html += self._generate_html_header_level(field.nested, target_level, current_level + 1, max_depth,
+                                                         compact)
 
         return html
 
-    def _count_leaf_columns(self, field):
-        """Count how many leaf columns a field spans."""
-        if field['nested'] is None:
-            return 1
-
-        count = 0
-        for nested_field in field['nested']:
-            count += self._count_leaf_columns(nested_field)
-
-        return count
-
-    def _generate_html_data_row(self, row_data, header_structure):
-        """Generate HTML data rows."""
-        cells = self._extract_row_cells(row_data, header_structure)
-        max_rows = self._calculate_max_nested_rows(cells)
-
-        # Update rowspan for non-nested cells
-        for cell in cells:
-            if not cell['is_nested']:
-                cell['rowspan'] = max_rows
-
-        html = ''
-        for row_index in range(max_rows):
-            html += '<tr>'
-            html += self._generate_html_data_cells(cells, row_index, max_rows)
-            html += '</tr>\n'
-
-        return html
+    def _generate_html_data_row(self, cells, max_rows, compact=False):
+        """Generate HTML data rows in a single top-down traversal of the record."""
+        rows = [[] for _ in range(max_rows)]
+        if compact:
+            self._generate_compact_html_data_cells(cells, rows, 0, max_rows)
+        else:
+            self._generate_html_data_cells(cells, rows, 0, max_rows)
+        return ''.join(f'<tr>{"".join(row)}</tr>\n' for row in rows)
 
-    def _extract_row_cells(self, row_data, header_structure):
-        """Extract cell data from a data row."""
+    def _extract_row_cells(self, row_data, header_structure, subtrees=None):
+        """Extract cell data from a data row together with the number of rows it spans."""
         cells = []
+        max_rows = 1
 
         for field in header_structure:
-            key = field['name']
+            key = field.name
 
             if key in row_data:
                 value = row_data[key]
 
                 if isinstance(value, list):
                     # Nested data
-                    nested_cells_list = []
-                    for nested_item in value:
-                        nested_cells = self._extract_row_cells(nested_item, field['nested'])
-                        nested_cells_list.append(nested_cells)
-
-                    cell_info = {
-                        'value': '',
-                        'rowspan': len(nested_cells_list),
-                        'is_nested': True,
-                        'nested_cells': nested_cells_list,
-                        'leaf_count': self._count_leaf_columns(field)
-                    }
+                    cell_info = self._extract_nested_cell(value, field, subtrees)
+                    if cell_info.rowspan > max_rows:
+                        max_rows = cell_info.rowspan
                 else:
                     # Simple data
-                    cell_info = {
-                        'value': str(value),
-                        'rowspan': 1,
-                        'is_nested': False,
-                        'leaf_count': 1
-                    }
+                    cell_info = _Cell(str(value), 1)
             else:
                 # Missing field
-                cell_info = {
-                    'value': '',
-                    'rowspan': 1,
-                    'is_nested': False,
-                    'leaf_count': self._count_leaf_columns(field)
-                }
+                cell_info = _Cell('', field.leaf_count)
 
             cells.append(cell_info)
 
-        return cells
-
-    def _calculate_max_nested_rows(self, cells):
-        """Calculate how many table rows are needed."""
-        max_rows = 1
-
+        return cells, max_rows
+
+    def _extract_nested_cell(self, value, field, subtrees=None):
+        """Extract the cell of a nested list, reusing the cell of a repeated list."""
+        if subtrees is not None and subtrees.enabled:
+            cell = subtrees.get(value, field)
+            if cell is not None:
+                return cell
+
+        nested_cells_list = []
+        total_rows = 0
+        for nested_item in value:
+            nested_cells = self._extract_row_cells(nested_item, field.nested, subtrees)
+            nested_cells_list.append(nested_cells)
+            total_rows += nested_cells[1]
+
+        cell = _NestedCell(field.leaf_count, nested_cells_list, total_rows)
+        if subtrees is not None and subtrees.enabled:
+            item_keys = tuple(subtrees.cells_key(nested_cells) for nested_cells, _ in nested_cells_list)
+            cell = subtrees.add(value, field, cell, item_keys)
+        return cell
+
+    def _generate_html_data_cells(self, cells, rows, row_offset, max_rows):
+        """Append HTML data cells to the table rows in which they start."""
         for cell in cells:
-            if cell['is_nested']:
-                total_rows = 0
-                for nested_cells in cell['nested_cells']:
-                    nested_max_rows = self._calculate_max_nested_rows(nested_cells)
-                    total_rows += nested_max_rows
-
-                if total_rows > max_rows:
-                    max_rows = total_rows
-
-        return max_rows
+            if cell.nested is not None:
+                current_row = row_offset
 
-    def _generate_html_data_cells(self, cells, row_index, max_rows):
-        """Generate HTML data cells for a specific row."""
-        html = ''
+                if cell.shared:
+                    self._append_shared_html(cell, rows, row_offset, False)
+                    current_row += cell.rowspan
+                else:
+                    for nested_cells, nested_max_rows in cell.nested:
+                        self._generate_html_data_cells(nested_cells, rows, current_row, nested_max_rows)
+                        current_row += nested_max_rows
+
+                # Rows below the last nested item get empty cells
+                empty_cells = '<td class="td"></td>' * cell.leaf_count
+                for row_index in range(current_row, row_offset + max_rows):
+                    rows[row_index].append(empty_cells)
+            else:
+                rows[row_offset].append(f'<td rowspan="{max_rows}" class="td">{cell.value}</td>')
 
+    def _generate_compact_html_data_cells(self, cells, rows, row_offset, max_rows):
+        """Append compact HTML data cells with escaped values to the table rows in which they start."""
+        from html import escape
         for cell in cells:
-            if cell['is_nested']:
-                nested_cells_list = cell['nested_cells']
-                accumulated_rows = 0
-                found = False
+            if cell.nested is not None:
+                current_row = row_offset
 
-                for nested_cells in nested_cells_list:
-                    nested_max_rows = self._calculate_max_nested_rows(nested_cells)
+                if cell.shared:
+                    self._append_shared_html(cell, rows, row_offset, True)
+                    current_row += cell.rowspan
+                else:
+                    for nested_cells, nested_max_rows in cell.nested:
+                        self._generate_compact_html_data_cells(nested_cells, rows, current_row, nested_max_rows)
+                        current_row += nested_max_rows
+
+                empty_cells = '<td></td>' * cell.leaf_count
+                for row_index in range(current_row, row_offset + max_rows):
+                    rows[row_index].append(empty_cells)
+            elif max_rows > 1:
+                rows[row_offset].append(f'<td rowspan="{max_rows}">{escape(cell.value, False)}</td>')
+            else:
+                rows[row_offset].append(f'<td>{escape(cell.value, False)}</td>')
+
+    def _append_shared_html(self, cell, rows, row_offset, compact):
+        """Append the HTML rows of the nested items of a shared cell, rendered on first use."""
+        if cell.html is None or cell.html[0] is not compact:
+            block = [[] for _ in range(cell.rowspan)]
+            current_row = 0
+            generate_cells = self._generate_compact_html_data_cells if compact else self._generate_html_data_cells
+            for nested_cells, nested_max_rows in cell.nested:
+                generate_cells(nested_cells, block, current_row, nested_max_rows)
+                current_row += nested_max_rows
+            cell.html = (compact, [''.join(row) for row in block])
+
+        for row_index, html in enumerate(cell.html[1], row_offset):
+            rows[row_index].append(html)
+
+    def _generate_text_table(self, header_structure, max_depth, layout, text_format=None):
+        """Generate text-based ASCII table."""
+        if text_format is not None:
+            layout = self._fit_layout(layout, text_format)
+        col_info = self._build_column_info(header_structure, layout, text_format)
+        return '\n'.join(self._iter_text_table(header_structure, max_depth, col_info, layout, text_format))
 
-                    if row_index < accumulated_rows + nested_max_rows and not found:
-                        relative_row_index = row_index - accumulated_rows
-                        html += self._generate_html_data_cells(nested_cells, relative_row_index, nested_max_rows)
-                        found = True
+    def _fit_layout(self, layout, text_format):
+        """Apply a text format to the values of a layout."""
+        shared_cells = {}
+        return [(self._fit_cells(cells, text_format, shared_cells), height) for cells, height in layout]
 
-                    accumulated_rows += nested_max_rows
+    def _fit_cells(self, cells, text_format, shared_cells=None):
+        """Return copies of the cells with the values formatted for the text table.
+
+        Shared cells are formatted once when a shared_cells dictionary is given.
+        """
+        fitted = []
 
-                if not found:
-                    for _ in range(cell['leaf_count']):
-                        html += '<td class="td"></td>'
+        for cell in cells:
+            if cell.nested is not None:
+                if cell.shared and shared_cells is not None:
+                    fitted_cell = shared_cells.get(id(cell))
+                    if fitted_cell is not None:
+                        fitted.append(fitted_cell)
+                        continue
+                nested = [(self._fit_cells(nested_cells, text_format, shared_cells), nested_rows)
+                          for nested_cells, nested_rows in cell.nested]
+                fitted_cell = _NestedCell(cell.leaf_count, nested, cell.rowspan)
+                if cell.shared and shared_cells is not None:
+                    fitted_cell.shared = True
+                    shared_cells[id(cell)] = fitted_cell
+                fitted.append(fitted_cell)
             else:
-                if row_index == 0:
-                    html += f'<td rowspan="{max_rows}" class="td">{cell["value"]}</td>'
+                fitted.append(_Cell(text_format.fit(cell.value), cell.leaf_count))
 
-        return html
+        return fitted
 
-    def _generate_text_table(self, header_structure, max_depth, table_list):
-        """Generate text-based ASCII table."""
-        col_info = self._build_column_info(header_structure, table_list)
+    def _iter_text_table(self, header_structure, max_depth, col_info, layout, text_format=None):
+        """Yield the text table: borders and header, then one chunk per record."""
         top_border = self._generate_top_border(col_info)
-        header_rows = self._generate_header_rows(header_structure, max_depth, col_info)
-        header_sep = self._generate_header_separator(col_info)
-        body_rows = self._generate_body_rows(table_list, header_structure, col_info)
-        bottom_border = top_border
-
-        return '\n'.join([top_border, header_rows, header_sep, body_rows, bottom_border])
+        yield top_border
+        yield self._generate_header_rows(header_structure, max_depth, col_info, text_format)
+        yield self._generate_header_separator(col_info)
+        yield from self._iter_body_rows(layout, col_info)
+        yield top_border
 
-    def _build_column_info(self, structure, table_list):
+    def _build_column_info(self, structure, layout, text_format=None):
         """Calculate column widths by scanning headers and data."""
-        col_info = self._extract_leaf_columns(structure)
+        col_info = self._measure_column_info(structure, layout)
+        self._fit_column_widths(col_info, structure, text_format)
+        return col_info
 
-        for row_data in table_list:
-            cells = self._extract_row_cells(row_data, structure)
-            self._update_column_widths(col_info, cells, 0)
+    def _measure_column_info(self, structure, layout):
+        """Return the leaf columns with the widths of their names and of the values of a layout."""
+        cached = self._header_cache.get(id(structure))
+        if cached is None:
+            col_info = self._extract_leaf_columns(structure)
+        else:
+            leaf_columns = cached.get('leaf_columns')
+            if leaf_columns is None:
+                cached['leaf_columns'] = leaf_columns = self._extract_leaf_columns(structure)
+            col_info = [dict(col) for col in leaf_columns]
+
+        measured = {}
+        for cells, _ in layout:
+            self._update_column_widths(col_info, cells, 0, measured)
 
         return col_info
 
+    def _fit_column_widths(self, col_info, structure, text_format):
+        """Finish measured column widths for the header of the structure.
+
+        The widths are limited to the max_col_width of a text format, plus padding, and
+        header names wider than their columns are cut. Without a limit, the leaf columns
+        of a nested field are widened until its name fits above them.
+        """
+        if text_format is not None and text_format.max_width is not None:
+            for col in col_info:
+                col['width'] = min(col['width'], text_format.max_width + 2)
+        else:
+            self._widen_for_header_names(col_info, structure, 0)
+
+    def _widen_for_header_names(self, col_info, structure, col_offset):
+        """Widen the leaf columns of every nested field to the width of its name, inner fields first."""
+        for field in structure:
+            if field.nested:
+                self._widen_for_header_names(col_info, field.nested, col_offset)
+                columns = col_info[col_offset:col_offset + field.leaf_count]
+                missing = (_display_width(field.name) + 2) - (sum(col['width'] for col in columns) + len(columns) - 1)
+                if missing > 0:
+                    # The missing width is spread over the columns, the first ones get the remainder
+                    for i, col in enumerate(columns):
+                        col['width'] += missing // len(columns) + (i < missing % len(columns))
+            col_offset += field.leaf_count
+
     def _extract_leaf_columns(self, structure):
         """Extract leaf columns from structure."""
         col_info = []
 
         for field in structure:
-            if field['nested'] is None:
-                col_info.append({'name': field['name'], 'width': len(field['name']) + 2})
+            if not field.nested:
+                col_info.append({'name': field.name, 'width': _display_width(field.name) + 2})
             else:
-                col_info.extend(self._extract_leaf_columns(field['nested']))
+                col_info.extend(self._extract_leaf_columns(field.nested))
 
         return col_info
 
-    def _update_column_widths(self, col_info, cells, col_offset):
-        """Recursively update column widths based on data values."""
+    def _update_column_widths(self, col_info, cells, col_offset, measured=None):
+        """Recursively update column widths based on data values.
+
+        Shared cells are measured once per column when a measured dictionary is given.
+        """
         current_col = col_offset
 
         for cell in cells:
-            if cell['is_nested']:
-                for nested_cells in cell['nested_cells']:
-                    self._update_column_widths(col_info, nested_cells, current_col)
+            if cell.nested is not None:
+                if cell.shared and measured is not None:
+                    key = (id(cell), current_col)
+                    if key in measured:
+                        current_col += cell.leaf_count
+                        continue
+                    # Keeping the cell keeps its id from being reused while streaming
+                    measured[key] = cell
+                for nested_cells, _ in cell.nested:
+                    self._update_column_widths(col_info, nested_cells, current_col, measured)
             else:
-                value_len = len(str(cell['value'])) + 2
+                value = cell.value
+                if type(value) is str and value.isascii():
+                    value_len = len(value) + 2
+                else:
+                    value_len = _text_width(value) + 2
                 if value_len > col_info[current_col]['width']:
                     col_info[current_col]['width'] = value_len
 
-            current_col += cell['leaf_count']
+            current_col += cell.leaf_count
 
     def _generate_top_border(self, col_info):
         """Generate top border line."""
@@ -385,220 +2440,323 @@ class log_table:
         parts = ['=' * col['width'] for col in col_info]
         return '+' + '+'.join(parts) + '+'
 
-    def _generate_header_rows(self, header_structure, max_depth, col_info):
+    def _generate_header_rows(self, header_structure, max_depth, col_info, text_format=None):
         """Generate header rows."""
-        grid = self._build_header_grid(header_structure, max_depth, col_info)
-        lines = self._render_header_grid(grid, max_depth, col_info)
-        return '\n'.join(lines)
-
-    def _build_header_grid(self, header_structure, max_depth, col_info):
-        """Build 2D grid for header."""
-        num_cols = len(col_info)
-        grid = [[None] * num_cols for _ in range(max_depth)]
-        self._fill_header_grid(grid, header_structure, 0, 0, max_depth, col_info)
-        return grid
-
-    def _fill_header_grid(self, grid, structure, row_idx, col_idx, max_depth, col_info):
-        """Fill header grid with cells."""
+        # Header names are only cut when the column widths are capped
+        cut_names = text_format is not None and text_format.max_width is not None
+        widths = (tuple(col['width'] for col in col_info), cut_names)
+        header_rows = self._get_text_header(header_structure, widths)
+        if header_rows is not None:
+            return header_rows
+
+        spans = []
+        self._collect_header_spans(spans, header_structure, 0, 0, max_depth)
+        if cut_names:
+            spans = [self._fit_header_span(span, col_info) for span in spans]
+        # Only rows in which a header starts are rendered
+        content_rows = sorted({span[0] for span in spans})
+        header_rows = '\n'.join(self._render_span_lines(spans, content_rows, col_info))
+        self._put_text_header(header_structure, widths, header_rows)
+        return header_rows
+
+    def _get_text_header(self, header_structure, widths):
+        """Return the text header rows of a cached structure rendered for the widths key, or None."""
+        cached = self._header_cache.get(id(header_structure))
+        if cached is None:
+            return None
+        with self._cache_lock:
+            text_headers = cached.get('text_headers')
+            header_rows = None if text_headers is None else text_headers.get(widths)
+            if header_rows is not None:
+                text_headers.move_to_end(widths)
+            return header_rows
+
+    def _put_text_header(self, header_structure, widths, header_rows):
+        """Keep the text header rows of a cached structure for the widths key, at most 8 keys per structure."""
+        cached = self._header_cache.get(id(header_structure))
+        if cached is None:
+            return
+        with self._cache_lock:
+            # Rendered text headers of a cached structure are kept per column widths
+            text_headers = cached.setdefault('text_headers', OrderedDict())
+            text_headers[widths] = header_rows
+            if len(text_headers) > 8:
+                text_headers.popitem(last=False)
+
+    def _fit_header_span(self, span, col_info):
+        """Cut the name of a header span that is wider than its columns."""
+        start_row, end_row, col_start, colspan, text = span
+        width = sum(col['width'] for col in col_info[col_start:col_start + colspan]) + colspan - 3
+        if _display_width(text) > width:
+            text = _truncate_to_width(text, max(width, 1))
+        return start_row, end_row, col_start, colspan, text
+
+    def _collect_header_spans(self, spans, structure, row_idx, col_idx, max_depth):
+        """Collect the header cells as (start_row, end_row, col_start, colspan, text) spans."""
         current_col = col_idx
 
         for field in structure:
-            colspan = self._count_leaf_columns(field)
-
-            if field['nested'] is not None:
-                cell = {'text': field['name'], 'rowspan': 1, 'colspan': colspan, 'col_start': current_col, 'start_row': row_idx}
-                grid[row_idx][current_col] = cell
-
-                for i in range(1, colspan):
-                    grid[row_idx][current_col + i] = 'SPAN'
-
-                self._fill_header_grid(grid, field['nested'], row_idx + 1, current_col, max_depth, col_info)
+            if field.nested:
+                spans.append((row_idx, row_idx + 1, current_col, field.leaf_count, field.name))
+                self._collect_header_spans(spans, field.nested, row_idx + 1, current_col, max_depth)
             else:
-                rowspan = max_depth - row_idx
-                cell = {'text': field['name'], 'rowspan': rowspan, 'colspan': colspan, 'col_start': current_col, 'start_row': row_idx}
-                grid[row_idx][current_col] = cell
-
-                for r in range(row_idx + 1, max_depth):
-                    grid[r][current_col] = cell
+                spans.append((row_idx, max_depth, current_col, field.leaf_count, field.name))
 
-                for i in range(1, colspan):
-                    for r in range(row_idx, max_depth):
-                        grid[r][current_col + i] = 'SPAN'
+            current_col += field.leaf_count
 
-            current_col += colspan
+    def _render_span_lines(self, spans, row_indices, col_info):
+        """Render the given rows of a span layout with separator lines between them.
 
-    def _render_header_grid(self, grid, max_depth, col_info):
-        """Render header grid as text lines."""
+        A span covers the rows start_row..end_row-1 and shows its text in its first row,
+        or the lines of a _TextBlock in all of them. Columns not covered by any span in a
+        row are rendered blank.
+        """
+        widths = [col['width'] for col in col_info]
+        spans.sort(key=lambda span: (span[0], span[2]))
+        if any(type(span[4]) is tuple for span in spans):
+            return self._render_wrapped_span_lines(spans, row_indices, widths)
         lines = []
-        content_rows = []
-
-        for row_idx in range(max_depth):
-            has_content = False
-            for cell in grid[row_idx]:
-                if cell != 'SPAN' and cell is not None and cell.get('start_row') == row_idx:
-                    has_content = True
-                    break
-            if has_content:
-                content_rows.append(row_idx)
-
-        for i, row_idx in enumerate(content_rows):
-            line = self._render_header_grid_row(grid[row_idx], row_idx, col_info)
-            lines.append(line)
-
-            if i < len(content_rows) - 1:
-                next_row_idx = content_rows[i + 1]
-                sep = self._generate_row_separator(grid[row_idx], grid[next_row_idx], col_info)
-                lines.append(sep)
+        active = []
+        next_span = 0
+
+        for i, row_idx in enumerate(row_indices):
+            active = [span for span in active if span[1] > row_idx]
+            while next_span < len(spans) and spans[next_span][0] <= row_idx:
+                if spans[next_span][1] > row_idx:
+                    active.append(spans[next_span])
+                next_span += 1
+            active.sort(key=lambda span: span[2])
+
+            lines.append(self._render_span_row(active, row_idx, widths))
+            if i < len(row_indices) - 1:
+                lines.append(self._render_span_separator(active, row_indices[i + 1], widths))
 
         return lines
 
-    def _render_header_grid_row(self, row, row_idx, col_info):
-        """Render one header grid row."""
+    def _render_span_row(self, active, row_idx, widths):
+        """Render one row from the spans covering it, ordered by column."""
         parts = []
+        col = 0
 
-        for col_idx, cell in enumerate(row):
-            if cell == 'SPAN':
-                continue
-            elif cell is None:
-                parts.append(' ' * col_info[col_idx]['width'])
-            else:
-                text = cell['text']
-                colspan = cell['colspan']
-                col_start = cell['col_start']
-                start_row = cell['start_row']
+        for start_row, _, col_start, colspan, text in active:
+            while col < col_start:
+                parts.append(' ' * widths[col])
+                col += 1
 
-                total_width = sum(col_info[col_start + i]['width'] + 1 for i in range(colspan)) - 1
+            col = col_start + colspan
+            if type(text) is _TextBlock:
+                parts.append(text.lines[2 * (row_idx - start_row)])
+                continue
+            total_width = sum(widths[col_start:col]) + colspan - 1
+            display_text = text if row_idx == start_row else ''
+            parts.append(f'{display_text:^{total_width}}' if display_text.isascii()
+                         else _center(display_text, total_width))
 
-                display_text = text if row_idx - start_row == 0 else ''
-                text_len = len(display_text)
-                padding = total_width - text_len
-                left_pad = padding // 2
-                right_pad = padding - left_pad
-                padded_text = ' ' * left_pad + display_text + ' ' * right_pad
-                parts.append(padded_text)
+        while col < len(widths):
+            parts.append(' ' * widths[col])
+            col += 1
 
         return '|' + '|'.join(parts) + '|'
 
-    def _generate_row_separator(self, current_row, next_row, col_info):
-        """Generate separator line between rows."""
-        parts = []
+    def _render_wrapped_span_lines(self, spans, row_indices, widths):
+        """Render rows holding wrapped texts, given as tuples of lines.
 
-        for col_idx in range(len(col_info)):
-            curr_cell = current_row[col_idx]
-            next_cell = next_row[col_idx]
-            width = col_info[col_idx]['width']
+        Every row gets as many lines as the wrapped texts starting in it need. A wrapped
+        text runs on through the separator lines of the rows it spans, where its column
+        is open. Wrapped texts always come from simple cells, which span one column.
+        """
+        row_positions = {row_idx: i for i, row_idx in enumerate(row_indices)}
+        heights = [1] * len(row_indices)
+        for start_row, end_row, _, _, text in sorted(spans, key=lambda span: span[1]):
+            if type(text) is not str:
+                covered = [row_positions[row_idx] for row_idx in range(start_row, end_row) if row_idx in row_positions]
+                available = sum(heights[i] for i in covered) + len(covered) - 1
+                if len(text) > available:
+                    heights[covered[-1]] += len(text) - available
 
-            is_continuing = (curr_cell != 'SPAN' and next_cell != 'SPAN' and
-                           curr_cell is not None and next_cell is not None and
-                           curr_cell is next_cell)
+        lines = []
+        active = []
+        next_span = 0
+        starts = {}
+        position = 0
+
+        for i, row_idx in enumerate(row_indices):
+            starts[row_idx] = position
+            active = [span for span in active if span[1] > row_idx]
+            while next_span < len(spans) and spans[next_span][0] <= row_idx:
+                if spans[next_span][1] > row_idx:
+                    active.append(spans[next_span])
+                next_span += 1
+            active.sort(key=lambda span: span[2])
+
+            for line in range(heights[i]):
+                # Spans holding the text of this line, all starting on it
+                line_spans = [(0, end_row, col_start, colspan,
+                               self._wrapped_line(text, position + line - starts[start_row]))
+                              for start_row, end_row, col_start, colspan, text in active]
+                lines.append(self._render_span_row(line_spans, 0, widths))
+            position += heights[i]
+
+            if i < len(row_indices) - 1:
+                # Wrapped texts continue in the open columns of the separator
+                open_texts = {}
+                for start_row, end_row, col_start, _, text in active:
+                    line = position - starts[start_row]
+                    if type(text) is not str and end_row > row_indices[i + 1] and line < len(text):
+                        open_texts[col_start] = text[line]
+                lines.append(self._render_span_separator(active, row_indices[i + 1], widths, open_texts))
+                position += 1
 
-            parts.append(' ' * width if is_continuing else '-' * width)
+        return lines
+
+    def _wrapped_line(self, text, line):
+        """Return the line of a span text shown on the given line of the span."""
+        if type(text) is str:
+            return text if line == 0 else ''
+        return text[line] if line < len(text) else ''
 
-        sep = ''
-        for i, part in enumerate(parts):
-            if i == 0:
-                sep = ('+' if '-' in part else '|') + part
+    def _render_span_separator(self, active, next_row_idx, widths, open_texts=None):
+        """Generate the separator line above next_row_idx.
+
+        The line stays open only under the first column of a span that continues
+        into the next row. open_texts optionally maps open columns to the text shown in them.
+        A _TextBlock continuing into the next row gives its own separator line.
+        """
+        continuing = set()
+        blocks = {}
+        for start_row, end_row, col_start, colspan, text in active:
+            if end_row > next_row_idx:
+                if type(text) is _TextBlock:
+                    blocks[col_start] = (colspan, text.lines[2 * (next_row_idx - start_row) - 1])
+                else:
+                    continuing.add(col_start)
+        dashed = [col not in continuing for col in range(len(widths))]
+        for col_start, (colspan, line) in blocks.items():
+            # The block columns at its edges are open where its line is
+            dashed[col_start] = line[0] == '-'
+            dashed[col_start + colspan - 1] = line[-1] == '-'
+
+        sep = '+' if dashed[0] else '|'
+        col = 0
+        while col < len(widths):
+            width = widths[col]
+            if col:
+                sep += '+' if dashed[col - 1] or dashed[col] else '|'
+            if col in blocks:
+                colspan, line = blocks[col]
+                sep += line
+                col += colspan
+                continue
+            if dashed[col]:
+                sep += '-' * width
+            elif open_texts and col in open_texts:
+                text = open_texts[col]
+                sep += f'{text:^{width}}' if text.isascii() else _center(text, width)
             else:
-                prev_part = parts[i - 1]
-                has_left_dash = '-' in prev_part
-                has_right_dash = '-' in part
-                sep += ('+' if has_left_dash or has_right_dash else '|') + part
+                sep += ' ' * width
+            col += 1
 
-        last_part = parts[-1]
-        sep += '+' if '-' in last_part else '|'
+        return sep + ('+' if dashed[-1] else '|')
 
-        return sep
+    def _iter_body_rows(self, layout, col_info):
+        """Yield the body lines of each record, separated by data row separators."""
+        row_separator = None
+
+        for cells, num_text_rows in layout:
+            if row_separator is None:
+                row_separator = self._generate_data_row_separator(col_info)
+            else:
+                yield row_separator
 
-    def _generate_body_rows(self, table_list, header_structure, col_info):
-        """Generate body rows."""
-        all_lines = []
+            yield self._generate_text_record(cells, num_text_rows, col_info)
 
-        for data_row_idx, row_data in enumerate(table_list):
-            cells = self._extract_row_cells(row_data, header_structure)
-            num_text_rows = self._calculate_max_nested_rows(cells)
-            grid = self._build_body_grid(cells, num_text_rows, col_info)
-            row_lines = self._render_body_grid(grid, num_text_rows, col_info)
-            all_lines.extend(row_lines)
+        if row_separator is None:
+            # An empty body still takes one (blank) line
+            yield ''
 
-            if data_row_idx < len(table_list) - 1:
-                all_lines.append(self._generate_data_row_separator(col_info))
+    def _generate_text_record(self, cells, num_text_rows, col_info):
+        """Generate the body lines of one record.
 
-        return '\n'.join(all_lines)
+        Shared cells are rendered once per column widths and spliced in as a _TextBlock,
+        unless the record holds wrapped texts, which change the height of its rows.
+        """
+        spans = []
+        self._collect_body_spans(spans, cells, 0, 0, num_text_rows, col_info)
+        if any(type(span[4]) is tuple or type(span[4]) is _TextBlock and span[4].lines is None
+               for span in spans):
+            spans = []
+            self._collect_body_spans(spans, cells, 0, 0, num_text_rows)
+        return '\n'.join(self._render_span_lines(spans, range(num_text_rows), col_info))
+
+    def _shared_text_block(self, cell, col_info):
+        """Return the _TextBlock of a shared cell for the widths of its columns."""
+        widths = tuple(col['width'] for col in col_info)
+        if cell.text is None or cell.text[0] != widths:
+            spans = []
+            self._collect_body_spans(spans, [cell], 0, 0, cell.rowspan)
+            if any(type(span[4]) is tuple for span in spans):
+                # Wrapped texts are rendered with the rest of the record
+                block = _TextBlock(None)
+            else:
+                lines = self._render_span_lines(spans, range(cell.rowspan), col_info)
+                block = _TextBlock([line[1:-1] for line in lines])
+            cell.text = (widths, block)
+        return cell.text[1]
 
-    def _build_body_grid(self, cells, num_text_rows, col_info):
-        """Build 2D grid for body."""
-        num_cols = len(col_info)
-        grid = [[None] * num_cols for _ in range(num_text_rows)]
-        self._fill_body_grid(grid, cells, 0, 0, num_text_rows)
-        return grid
+    def _collect_body_spans(self, spans, cells, row_offset, col_offset, num_text_rows, col_info=None):
+        """Collect the simple cells of a record as (start_row, end_row, col_start, colspan, text) spans.
 
-    def _fill_body_grid(self, grid, cells, row_offset, col_offset, num_text_rows):
-        """Fill body grid with cells."""
+        With col_info, shared cells are collected as one span holding their _TextBlock.
+        """
         current_col = col_offset
 
         for cell in cells:
-            if cell['is_nested']:
+            if cell.nested is not None and cell.shared and col_info is not None:
+                block = self._shared_text_block(cell, col_info[current_col:current_col + cell.leaf_count])
+                spans.append((row_offset, row_offset + cell.rowspan, current_col, cell.leaf_count, block))
+            elif cell.nested is not None:
                 current_row = row_offset
-                for nested_cells in cell['nested_cells']:
-                    nested_rows = self._calculate_max_nested_rows(nested_cells)
-                    self._fill_body_grid(grid, nested_cells, current_row, current_col, nested_rows)
+                for nested_cells, nested_rows in cell.nested:
+                    self._collect_body_spans(spans, nested_cells, current_row, current_col, nested_rows, col_info)
                     current_row += nested_rows
             else:
-                value = str(cell['value'])
-                cell_info = {'value': value, 'rowspan': num_text_rows, 'colspan': cell['leaf_count'],
-                           'col_start': current_col, 'start_row': row_offset}
-
-                for r in range(row_offset, row_offset + num_text_rows):
-                    grid[r][current_col] = cell_info
+                spans.append((row_offset, row_offset + num_text_rows, current_col, cell.leaf_count, cell.value))
 
-                for c in range(1, cell['leaf_count']):
-                    for r in range(row_offset, row_offset + num_text_rows):
-                        grid[r][current_col + c] = 'SPAN'
+            current_col += cell.leaf_count
 
-            current_col += cell['leaf_count']
-
-    def _render_body_grid(self, grid, num_text_rows, col_info):
-        """Render body grid as text lines."""
-        lines = []
-
-        for row_idx in range(num_text_rows):
-            line = self._render_body_grid_row(grid[row_idx], row_idx, col_info)
-            lines.append(line)
+    def _generate_data_row_separator(self, col_info):
+        """Generate separator between data rows."""
+        parts = ['-' * col['width'] for col in col_info]
+        return '+' + '+'.join(parts) + '+'
 
-            if row_idx < num_text_rows - 1:
-                sep = self._generate_row_separator(grid[row_idx], grid[row_idx + 1], col_info)
-                lines.append(sep)
 
-        return lines
+# Rows and header structure of the table rendered by a worker process
+_worker_table = None
 
-    def _render_body_grid_row(self, row, row_idx, col_info):
-        """Render one body grid row."""
-        parts = []
 
-        for col_idx, cell in enumerate(row):
-            if cell == 'SPAN':
-                continue
-            elif cell is None:
-                parts.append(' ' * col_info[col_idx]['width'])
-            else:
-                value = cell['value']
-                colspan = cell['colspan']
-                col_start = cell['col_start']
-                start_row = cell['start_row']
+def _init_render_worker(table_list, header_structure, text_format=None, compact=False):
+    """Store the table to render in a worker process."""
+    global _worker_table
+    _worker_table = (log_table(), table_list, header_structure, text_format, compact)
 
-                total_width = sum(col_info[col_start + i]['width'] + 1 for i in range(colspan)) - 1
 
-                display_text = value if row_idx - start_row == 0 else ''
-                text_len = len(display_text)
-                padding = total_width - text_len
-                left_pad = padding // 2
-                right_pad = padding - left_pad
-                padded_text = ' ' * left_pad + display_text + ' ' * right_pad
-                parts.append(padded_text)
+def _render_html_chunk(bounds):
+    """Render the HTML rows of a chunk of records and measure its column widths."""
+    library, table_list, header_structure, text_format, compact = _worker_table
+    start, end = bounds
+    layout = library._compile_layout(table_list[start:end], header_structure)
+    html = ''.join(library._generate_html_data_row(cells, height, compact) for cells, height in layout)
+    if text_format is not None:
+        layout = library._fit_layout(layout, text_format)
+    # The widths are finished once those of all chunks are merged
+    return html, library._measure_column_info(header_structure, layout)
 
-        return '|' + '|'.join(parts) + '|'
 
-    def _generate_data_row_separator(self, col_info):
-        """Generate separator between data rows."""
-        parts = ['-' * col['width'] for col in col_info]
-        return '+' + '+'.join(parts) + '+'
+def _render_text_chunk(task):
+    """Render the text rows of a chunk of records with the final column widths."""
+    library, table_list, header_structure, text_format, _ = _worker_table
+    start, end, col_info = task
+    layout = library._compile_layout(table_list[start:end], header_structure)
+    if text_format is not None:
+        layout = library._fit_layout(layout, text_format)
+    return '\n'.join(library._iter_body_rows(layout, col_info))